@@ -1,9 +1,13 @@
 from __future__ import with_statement
 
+import functools
 import hashlib
 import importlib
 import json
+import threading
+import time
 from datetime import datetime
+from wsgiref.util import FileWrapper
 
 import django
 from django.conf import settings
@@ -12,15 +16,22 @@ from django.contrib import admin
 from django.contrib import messages
 from django.contrib.admin.models import LogEntry, ADDITION, CHANGE, DELETION
 from django.contrib.contenttypes.models import ContentType
+from django.core import signing
+from django.core.exceptions import ValidationError
 from django.core.urlresolvers import reverse
-from django.http import (HttpResponseRedirect,
+from django.http import (Http404,
+                         HttpResponseRedirect,
                          HttpResponse,
-                         HttpResponseForbidden)
+                         HttpResponseForbidden,
+                         HttpResponseNotModified,
+                         StreamingHttpResponse)
 from django.template.response import TemplateResponse
 from django.utils import six
-from django.utils.encoding import smart_str
+from django.utils.encoding import force_bytes, smart_str
 from django.utils.translation import ugettext_lazy as _
 
+from .export_cache import ExportCache
+from .export_jobs import ExportJob
 from .formats import base_formats
 from .forms import (
     ImportForm,
@@ -31,7 +42,10 @@ from .forms import (
 )
 from .resources import (
     modelresource_factory,
+    overrides,
+    Resource,
 )
+from .plans import ImportPlan
 from .results import RowResult
 from .tmp_storages import TempFolderStorage
 
@@ -53,6 +67,19 @@ if isinstance(TMP_STORAGE_CLASS, six.string_types):
     except ImportError as e:
         msg = "Could not import '%s' for import_export setting 'IMPORT_EXPORT_TMP_STORAGE_CLASS'" % TMP_STORAGE_CLASS
         raise ImportError(msg)
+TMP_STORAGE_TTL = getattr(settings, 'IMPORT_EXPORT_TMP_STORAGE_TTL', 86400)
+EXPORT_CACHE_TTL = getattr(settings, 'IMPORT_EXPORT_EXPORT_CACHE_TTL', None)
+EXPORT_CACHE_MAX_SIZE = getattr(
+        settings, 'IMPORT_EXPORT_EXPORT_CACHE_MAX_SIZE', 100 * 1024 * 1024)
+EXPORT_JOB_THRESHOLD = getattr(
+        settings, 'IMPORT_EXPORT_EXPORT_JOB_THRESHOLD', None)
+EXPORT_JOB_WORKERS = getattr(settings, 'IMPORT_EXPORT_EXPORT_JOB_WORKERS', 2)
+TMP_STORAGE_SWEEP_INTERVAL = getattr(
+        settings, 'IMPORT_EXPORT_TMP_STORAGE_SWEEP_INTERVAL', None)
+
+_sweep_lock = threading.Lock()
+#: time of the last periodic sweep for each storage class
+_last_sweeps = {}
 
 #: import / export formats
 DEFAULT_FORMATS = (
@@ -62,8 +89,10 @@ DEFAULT_FORMATS = (
     base_formats.TSV,
     base_formats.ODS,
     base_formats.JSON,
+    base_formats.NDJSON,
     base_formats.YAML,
     base_formats.HTML,
+    base_formats.Parquet,
 )
 
 
@@ -100,6 +129,16 @@ class ImportMixin(ImportExportMixinBase):
     skip_admin_log = None
     # storage class for saving temporary files
     tmp_storage_class = None
+    #: replay writes recorded during the dry run on confirm instead of
+    #: running the whole import again
+    use_import_plan = False
+    #: maximum age in seconds of an import plan that can be replayed
+    import_plan_max_age = 3600
+    #: maximum number of abandoned temporary files removed by one periodic
+    #: sweep
+    tmp_storage_sweep_batch_size = 100
+    #: import rows of all sheets of workbook formats, not only the first one
+    import_all_sheets = False
 
     def get_skip_admin_log(self):
         if self.skip_admin_log is None:
@@ -148,6 +187,86 @@ class ImportMixin(ImportExportMixinBase):
         """
         return [f for f in self.formats if f().can_import()]
 
+    def sweep_tmp_storage(self):
+        """
+        Removes temporary files older than ``IMPORT_EXPORT_TMP_STORAGE_TTL``
+        if ``IMPORT_EXPORT_TMP_STORAGE_SWEEP_INTERVAL`` seconds passed since
+        the last sweep in this process.
+        """
+        if not TMP_STORAGE_SWEEP_INTERVAL:
+            return
+        tmp_storage_class = self.get_tmp_storage_class()
+        if not _sweep_lock.acquire(False):
+            # another thread is checking already
+            return
+        try:
+            now = time.time()
+            last_sweep = _last_sweeps.get(tmp_storage_class, 0)
+            if now - last_sweep < TMP_STORAGE_SWEEP_INTERVAL:
+                return
+            _last_sweeps[tmp_storage_class] = now
+        finally:
+            _sweep_lock.release()
+        try:
+            tmp_storage_class.sweep(TMP_STORAGE_TTL,
+                                    self.tmp_storage_sweep_batch_size)
+        except NotImplementedError:
+            pass
+
+    def save_import_plan(self, plan):
+        """
+        Saves ``plan`` to temporary storage and returns its name.
+        """
+        tmp_storage = self.get_tmp_storage_class()()
+        tmp_storage.save(force_bytes(plan.dumps()))
+        return tmp_storage.name
+
+    def load_import_plan(self, resource, name):
+        """
+        Returns import plan saved under ``name`` or ``None`` if it is
+        missing, invalid or stale.
+        """
+        if not name:
+            return None
+        tmp_storage = self.get_tmp_storage_class()(name=name)
+        try:
+            data = tmp_storage.read()
+            tmp_storage.remove()
+        except (IOError, OSError):
+            return None
+        if not data:
+            return None
+        try:
+            plan = ImportPlan.loads(force_text(data))
+        except signing.BadSignature:
+            return None
+        if plan.is_stale(resource.get_import_plan_version(),
+                         self.import_plan_max_age):
+            return None
+        return plan
+
+    def get_import_dataset(self, input_format, tmp_storage, resource=None):
+        """
+        Returns dataset-like object with rows of file in ``tmp_storage``.
+
+        With ``import_all_sheets``, rows of all sheets of workbook formats
+        are chained, otherwise rows are read lazily where the format
+        supports it. A ``tablib.Dataset`` is returned when ``resource``
+        overrides ``before_import``, which may modify the dataset.
+        """
+        if self.import_all_sheets and input_format.can_import_sheets():
+            with tmp_storage.open_stream() as stream:
+                return base_formats.DatasetChain(
+                    input_format.create_datasets_from_stream(
+                        stream, self.from_encoding))
+        if resource is not None and overrides(resource, Resource,
+                                              'before_import'):
+            with tmp_storage.open_stream() as stream:
+                return input_format.create_dataset_from_stream(
+                    stream, self.from_encoding)
+        return input_format.create_row_stream(tmp_storage.open_stream,
+                                              self.from_encoding)
+
     def process_import(self, request, *args, **kwargs):
         '''
         Perform the actual import action (after the user has confirmed he
@@ -163,15 +282,19 @@ class ImportMixin(ImportExportMixinBase):
                 int(confirm_form.cleaned_data['input_format'])
             ]()
             tmp_storage = self.get_tmp_storage_class()(name=confirm_form.cleaned_data['import_file_name'])
-            data = tmp_storage.read(input_format.get_read_mode())
-            if not input_format.is_binary() and self.from_encoding:
-                data = force_text(data, self.from_encoding)
-            dataset = input_format.create_dataset(data)
-
-            result = resource.import_data(dataset, dry_run=False,
-                    raise_errors=True,
-                    file_name=confirm_form.cleaned_data['original_file_name'],
-                    user=request.user)
+            plan = self.load_import_plan(
+                    resource, confirm_form.cleaned_data['import_plan_name'])
+            if plan is not None:
+                result = resource.replay_plan(plan, raise_errors=True,
+                        file_name=confirm_form.cleaned_data['original_file_name'],
+                        user=request.user)
+            else:
+                dataset = self.get_import_dataset(input_format, tmp_storage,
+                                                  resource)
+                result = resource.import_data(dataset, dry_run=False,
+                        raise_errors=True,
+                        file_name=confirm_form.cleaned_data['original_file_name'],
+                        user=request.user)
 
             if not self.get_skip_admin_log():
                 # Add imported objects to LogEntry
@@ -221,30 +344,26 @@ class ImportMixin(ImportExportMixinBase):
             input_format = import_formats[
                 int(form.cleaned_data['input_format'])]()
             import_file = form.cleaned_data['import_file']
+            self.sweep_tmp_storage()
             # first always write the uploaded file to disk as it may be a
             # memory file or else based on settings upload handlers
             tmp_storage = self.get_tmp_storage_class()()
-            data = bytes()
-            for chunk in import_file.chunks():
-                data += chunk
+            tmp_storage.save_chunks(import_file.chunks())
 
-            tmp_storage.save(data, input_format.get_read_mode())
-
-            # then read the file, using the proper format-specific mode
-            # warning, big files may exceed memory
+            # then read the file, using the proper format-specific mode,
+            # formats supporting it read rows lazily during the import
             try:
-                data = tmp_storage.read(input_format.get_read_mode())
-                if not input_format.is_binary() and self.from_encoding:
-                    data = force_text(data, self.from_encoding)
-                dataset = input_format.create_dataset(data)
+                dataset = self.get_import_dataset(input_format, tmp_storage,
+                                                  resource)
+                result = resource.import_data(dataset, dry_run=True,
+                        raise_errors=False,
+                        collect_plan=self.use_import_plan,
+                        file_name=import_file.name,
+                        user=request.user)
             except UnicodeDecodeError as e:
                 return HttpResponse(_(u"<h1>Imported file is not in unicode: %s</h1>" % e))
             except Exception as e:
                 return HttpResponse(_(u"<h1>%s encountred while trying to read file: %s</h1>" % (type(e).__name__, e)))
-            result = resource.import_data(dataset, dry_run=True,
-                    raise_errors=False,
-                    file_name=import_file.name,
-                    user=request.user)
 
             context['result'] = result
 
@@ -253,6 +372,8 @@ class ImportMixin(ImportExportMixinBase):
                     'import_file_name': tmp_storage.name,
                     'original_file_name': import_file.name,
                     'input_format': form.cleaned_data['input_format'],
+                    'import_plan_name': self.save_import_plan(result.plan)
+                            if self.use_import_plan else '',
                 })
 
         if django.VERSION >= (1, 8, 0):
@@ -388,12 +509,10 @@ class GenericImportMixin(ImportMixin):
             tmp_storage = self.get_tmp_storage_class()(name=form.cleaned_data['import_file_name'])
 
             # then read the file, using the proper format-specific mode
-            # warning, big files may exceed memory
             try:
-                data = tmp_storage.read(input_format.get_read_mode())
-                if not input_format.is_binary() and self.from_encoding:
-                    data = force_text(data, self.from_encoding)
-                dataset = input_format.create_dataset(data)
+                with tmp_storage.open_stream() as stream:
+                    dataset = input_format.create_dataset_from_stream(
+                            stream, self.from_encoding)
             except UnicodeDecodeError as e:
                 return HttpResponse(_(u"<h1>Imported file is not in unicode: %s</h1>" % e))
             except Exception as e:
@@ -406,6 +525,7 @@ class GenericImportMixin(ImportMixin):
 
             result = resource.import_data(dataset, dry_run=True,
                     raise_errors=False,
+                    collect_plan=self.use_import_plan,
                     file_name=form.cleaned_data['original_file_name'],
                     user=request.user)
 
@@ -419,6 +539,8 @@ class GenericImportMixin(ImportMixin):
                     'import_file_name': tmp_storage.name,
                     'original_file_name': form.cleaned_data['original_file_name'],
                     'input_format': form.cleaned_data['input_format'],
+                    'import_plan_name': self.save_import_plan(result.plan)
+                            if self.use_import_plan else '',
                 })
 
         if django.VERSION >= (1, 8, 0):
@@ -450,22 +572,17 @@ class GenericImportMixin(ImportMixin):
             input_format = import_formats[
                 int(form.cleaned_data['input_format'])]()
             import_file = form.cleaned_data['import_file']
+            self.sweep_tmp_storage()
             # first always write the uploaded file to disk as it may be a
             # memory file or else based on settings upload handlers
             tmp_storage = self.get_tmp_storage_class()()
-            data = bytes()
-            for chunk in import_file.chunks():
-                data += chunk
-
-            tmp_storage.save(data, input_format.get_read_mode())
+            tmp_storage.save_chunks(import_file.chunks())
 
             # then read the file, using the proper format-specific mode
-            # warning, big files may exceed memory
             try:
-                data = tmp_storage.read(input_format.get_read_mode())
-                if not input_format.is_binary() and self.from_encoding:
-                    data = force_text(data, self.from_encoding)
-                dataset = input_format.create_dataset(data)
+                with tmp_storage.open_stream() as stream:
+                    dataset = input_format.create_dataset_from_stream(
+                            stream, self.from_encoding)
             except UnicodeDecodeError as e:
                 return HttpResponse(_(u"<h1>Imported file is not in unicode: %s</h1>" % e))
             except Exception as e:
@@ -514,6 +631,17 @@ class ExportMixin(ImportExportMixinBase):
     formats = DEFAULT_FORMATS
     #: export data encoding
     to_encoding = "utf-8"
+    #: template for status view of background exports
+    export_job_template_name = 'admin/import_export/export_job.html'
+    #: exports of more rows than this run in the background, ``None`` uses
+    #: ``IMPORT_EXPORT_EXPORT_JOB_THRESHOLD`` setting
+    export_job_threshold = None
+    #: seconds exports are cached for, ``None`` uses
+    #: ``IMPORT_EXPORT_EXPORT_CACHE_TTL`` setting
+    export_cache_ttl = None
+    #: maximum total size in bytes of cached exports, ``None`` uses
+    #: ``IMPORT_EXPORT_EXPORT_CACHE_MAX_SIZE`` setting
+    export_cache_max_size = None
 
     def get_urls(self):
         urls = super(ExportMixin, self).get_urls()
@@ -521,6 +649,9 @@ class ExportMixin(ImportExportMixinBase):
             url(r'^export/$',
                     self.admin_site.admin_view(self.export_action),
                     name='%s_%s_export' % self.get_model_info()),
+            url(r'^export/(?P<job_id>[0-9a-f]{32})/$',
+                    self.admin_site.admin_view(self.export_job_view),
+                    name='%s_%s_export_job' % self.get_model_info()),
         ]
         return my_urls + urls
 
@@ -542,6 +673,23 @@ class ExportMixin(ImportExportMixinBase):
         """
         return [f for f in self.formats if f().can_export()]
 
+    def get_export_resource(self, export_fields=None):
+        """
+        Returns resource exporting fields named in ``export_fields``, or all
+        fields.
+        """
+        resource = self.get_export_resource_class()()
+        resource.export_fields = export_fields
+        return resource
+
+    def get_export_field_choices(self):
+        """
+        Returns choices of fields selectable in the export form.
+        """
+        resource = self.get_export_resource_class()()
+        return [(name, force_text(resource.fields[name].column_name))
+                for name in resource.get_export_order()]
+
     def get_export_filename(self, file_format):
         date_str = datetime.now().strftime('%Y-%m-%d')
         filename = "%s-%s.%s" % (self.model.__name__,
@@ -573,38 +721,260 @@ class ExportMixin(ImportExportMixinBase):
         except AttributeError:
             return cl.query_set
 
-    def get_export_data(self, file_format, queryset):
+    def get_export_data(self, file_format, queryset, export_fields=None):
         """
         Returns file_format representation for given queryset.
+
+        ``export_fields`` is a list of names of exported fields, all fields
+        are exported when it is ``None``.
         """
-        resource_class = self.get_export_resource_class()
-        data = resource_class().export(queryset)
+        resource = self.get_export_resource(export_fields)
+        data = resource.export(queryset)
         export_data = file_format.export_data(data)
         return export_data
 
-    def export_action(self, request, *args, **kwargs):
-        formats = self.get_export_formats()
-        form = ExportForm(formats, request.POST or None)
-        if form.is_valid():
-            file_format = formats[
-                int(form.cleaned_data['file_format'])
-            ]()
+    def get_export_stream(self, file_format, queryset, export_fields=None):
+        """
+        Returns export of ``queryset`` serialized while it is iterated:
+        iterator of chunks for formats that ``can_export_chunks``, binary
+        file-like object for formats that ``can_export_stream``.
 
-            queryset = self.get_export_queryset(request)
-            export_data = self.get_export_data(file_format, queryset)
-            content_type = file_format.get_content_type()
+        Falls back to ``get_export_data`` for other formats, or when
+        ``get_export_data`` or ``Resource.export`` is overridden.
+        """
+        resource = self.get_export_resource(export_fields)
+        # overrides of get_export_data may not accept export_fields
+        kwargs = {}
+        if export_fields is not None:
+            kwargs['export_fields'] = export_fields
+        if (overrides(self, ExportMixin, 'get_export_data') or
+                overrides(resource, Resource, 'export')):
+            return self.get_export_data(file_format, queryset, **kwargs)
+        if file_format.can_export_chunks():
+            return file_format.export_chunks(resource.get_export_headers(),
+                                             resource.iter_export(queryset))
+        if file_format.can_export_stream():
+            rows = resource.iter_export(queryset,
+                                        typed=file_format.is_typed())
+            return file_format.export_stream(resource.get_export_headers(),
+                                             rows,
+                                             resource.get_export_types())
+        return self.get_export_data(file_format, queryset, **kwargs)
+
+    def create_export_response(self, file_format, export_data):
+        """
+        Returns attachment response with ``export_data`` returned by
+        ``get_export_data`` or ``get_export_stream``; iterators and
+        file-like objects are streamed.
+        """
+        content_type = file_format.get_content_type()
+        if hasattr(export_data, 'read'):
+            response = StreamingHttpResponse(
+                FileWrapper(export_data, base_formats.CHUNK_SIZE),
+                content_type=content_type)
+        elif hasattr(export_data, '__next__') or hasattr(export_data, 'next'):
+            response = StreamingHttpResponse(export_data,
+                                             content_type=content_type)
+        else:
             # Django 1.7 uses the content_type kwarg instead of mimetype
             try:
                 response = HttpResponse(export_data, content_type=content_type)
             except TypeError:
                 response = HttpResponse(export_data, mimetype=content_type)
+        response['Content-Disposition'] = 'attachment; filename=%s' % (
+            self.get_export_filename(file_format),
+        )
+        return response
+
+    def get_export_cache(self):
+        """
+        Returns ``ExportCache`` or ``None`` when exports are not cached.
+        """
+        ttl = self.export_cache_ttl
+        if ttl is None:
+            ttl = EXPORT_CACHE_TTL
+        if ttl is None:
+            return None
+        max_size = self.export_cache_max_size
+        if max_size is None:
+            max_size = EXPORT_CACHE_MAX_SIZE
+        return ExportCache(TMP_STORAGE_CLASS, ttl, max_size)
+
+    def get_export_job_threshold(self):
+        if self.export_job_threshold is None:
+            return EXPORT_JOB_THRESHOLD
+        return self.export_job_threshold
+
+    def estimate_export_count(self, queryset):
+        """
+        Returns estimated number of exported rows of ``queryset``, compared
+        with ``export_job_threshold``.
+
+        Default implementation counts the rows, override to use a cheaper
+        estimate, ie. planner statistics of the database.
+        """
+        return queryset.count()
+
+    def use_export_job(self, queryset):
+        """
+        Returns ``True`` if export of ``queryset`` should run in the
+        background.
+        """
+        threshold = self.get_export_job_threshold()
+        if threshold is None:
+            return False
+        return self.estimate_export_count(queryset) > threshold
+
+    def start_export_job(self, request, file_format, queryset,
+                         export_fields=None, headers=None):
+        """
+        Starts ``ExportJob`` exporting ``queryset`` in the background and
+        redirects to its status view. ``headers`` are set on the download
+        response of the job.
+        """
+        job = ExportJob(self.get_export_filename(file_format),
+                        file_format.get_content_type(),
+                        user_id=request.user.pk,
+                        storage_class=TMP_STORAGE_CLASS,
+                        ttl=TMP_STORAGE_TTL,
+                        headers=headers)
+        job.start(functools.partial(self.get_export_stream, file_format,
+                                    queryset, export_fields),
+                  EXPORT_JOB_WORKERS)
+        url = reverse('admin:%s_%s_export_job' % self.get_model_info(),
+                      args=[job.id], current_app=self.admin_site.name)
+        return HttpResponseRedirect(url)
+
+    def export_job_view(self, request, job_id, *args, **kwargs):
+        """
+        Shows status of export job started by the current user and sends
+        its file with ``download`` parameter. Downloads have ETag of the
+        job, so repeated downloads are answered with 304 Not Modified.
+        """
+        job = ExportJob.get(job_id)
+        if job is None:
+            raise Http404
+        if job.user_id != request.user.pk:
+            return HttpResponseForbidden()
+        if 'download' in request.GET and job.status == job.DONE:
+            etag = '"%s"' % job.id
+            if etag in request.META.get('HTTP_IF_NONE_MATCH', ''):
+                response = HttpResponseNotModified()
+                response['ETag'] = etag
+                return response
+            try:
+                stream = job.open_stream()
+            except (IOError, OSError):
+                raise Http404
+            response = StreamingHttpResponse(
+                FileWrapper(stream, base_formats.CHUNK_SIZE),
+                content_type=job.content_type)
             response['Content-Disposition'] = 'attachment; filename=%s' % (
-                self.get_export_filename(file_format),
+                job.filename,
             )
+            response['ETag'] = etag
+            for name, value in job.headers.items():
+                response[name] = value
             return response
 
         context = {}
 
+        if django.VERSION >= (1, 8, 0):
+            context.update(self.admin_site.each_context(request))
+        elif django.VERSION >= (1, 7, 0):
+            context.update(self.admin_site.each_context())
+
+        context['job'] = job
+        context['opts'] = self.model._meta
+        return TemplateResponse(request, [self.export_job_template_name],
+                context, current_app=self.admin_site.name)
+
+    def get_export_response(self, request, file_format, queryset,
+                            export_fields=None, headers=None):
+        """
+        Returns response with export of ``queryset`` and ``headers``.
+
+        Exports estimated to be larger than ``export_job_threshold`` rows
+        run in the background (``start_export_job``), ``headers`` are then
+        set on the download of the job.
+
+        With ``get_export_cache``, exports are cached under a key derived
+        from the resource, format, query and
+        ``Resource.get_export_version``, so unchanged data is served from
+        the cache.
+        """
+        if self.use_export_job(queryset):
+            return self.start_export_job(request, file_format, queryset,
+                                         export_fields, headers)
+
+        export_cache = self.get_export_cache()
+        resource = self.get_export_resource(export_fields)
+        version = None
+        if export_cache is not None:
+            version = resource.get_export_version(queryset)
+        if version is None:
+            export_data = self.get_export_stream(file_format, queryset,
+                                                 export_fields)
+            response = self.create_export_response(file_format, export_data)
+            for name, value in (headers or {}).items():
+                response[name] = value
+            return response
+
+        key = export_cache.get_key(resource, file_format, queryset, version)
+        stream = export_cache.open(key)
+        if stream is None:
+            export_cache.set(key, self.get_export_stream(
+                file_format, queryset, export_fields))
+            stream = export_cache.open(key)
+        response = self.create_export_response(file_format, stream)
+        for name, value in (headers or {}).items():
+            response[name] = value
+        return response
+
+    def get_delta_export_response(self, request, file_format, queryset,
+                                  since, export_fields=None):
+        """
+        Returns response with rows of ``queryset`` changed after watermark
+        ``since`` and the new watermark in ``X-Export-Watermark`` header,
+        see ``ModelResource.get_delta_queryset``.
+        """
+        resource = self.get_export_resource_class()()
+        queryset, watermark = resource.get_delta_queryset(queryset, since)
+        headers = {'X-Export-Watermark': resource.format_watermark(watermark)}
+        return self.get_export_response(request, file_format, queryset,
+                                        export_fields, headers)
+
+    def export_action(self, request, *args, **kwargs):
+        formats = self.get_export_formats()
+        # delta exports need ModelResource.parse_watermark
+        form = ExportForm(formats, request.POST or None,
+                          fields=self.get_export_field_choices(),
+                          delta=hasattr(self.get_export_resource_class(),
+                                        'parse_watermark'))
+        if form.is_valid():
+            file_format = formats[
+                int(form.cleaned_data['file_format'])
+            ]()
+
+            queryset = self.get_export_queryset(request)
+            # no selected fields export all of them
+            export_fields = form.cleaned_data.get('export_fields') or None
+            since = form.cleaned_data.get('since')
+            if not since:
+                return self.get_export_response(request, file_format,
+                                                queryset, export_fields)
+            resource = self.get_export_resource_class()()
+            try:
+                since = resource.parse_watermark(since)
+            except ValidationError as e:
+                form.errors['since'] = form.error_class(e.messages)
+            else:
+                return self.get_delta_export_response(request, file_format,
+                                                      queryset, since,
+                                                      export_fields)
+
+        context = {}
+
         if django.VERSION >= (1, 8, 0):
             context.update(self.admin_site.each_context(request))
         elif django.VERSION >= (1, 7, 0):
@@ -675,17 +1045,7 @@ class ExportActionModelAdmin(ExportMixin, admin.ModelAdmin):
             formats = self.get_export_formats()
             file_format = formats[int(export_format)]()
 
-            export_data = self.get_export_data(file_format, queryset)
-            content_type = file_format.get_content_type()
-            # Django 1.7 uses the content_type kwarg instead of mimetype
-            try:
-                response = HttpResponse(export_data, content_type=content_type)
-            except TypeError:
-                response = HttpResponse(export_data, mimetype=content_type)
-            response['Content-Disposition'] = 'attachment; filename=%s' % (
-                self.get_export_filename(file_format),
-            )
-            return response
+            return self.get_export_response(request, file_format, queryset)
 
     export_admin_action.short_description = _(
             'Export selected %(verbose_name_plural)s')
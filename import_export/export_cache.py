@@ -0,0 +1,131 @@
+from __future__ import unicode_literals
+
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import six
+from django.utils.encoding import force_bytes
+
+from .tmp_storages import TempFolderStorage
+
+
+def iter_bytes(export_data):
+    """
+    Yields binary chunks of ``export_data`` returned by
+    ``ExportMixin.get_export_stream``, which is text, bytes, iterator of text
+    chunks or file-like object. Text is encoded with ``DEFAULT_CHARSET``.
+    """
+    if hasattr(export_data, 'read'):
+        chunks = iter(lambda: export_data.read(64 * 1024), b'')
+    elif isinstance(export_data, (six.text_type, six.binary_type)):
+        chunks = [export_data]
+    else:
+        chunks = export_data
+    for chunk in chunks:
+        if isinstance(chunk, six.text_type):
+            chunk = chunk.encode(settings.DEFAULT_CHARSET)
+        yield chunk
+
+
+class ExportCache(object):
+    """
+    Cache of exported files.
+
+    Files are saved with ``storage_class``, one of ``tmp_storages``
+    classes, and their names, sizes and creation times are kept in an index
+    in the Django cache, so a cache shared by all processes should be
+    configured. Entries expire after ``ttl`` seconds and the oldest entries
+    are removed when the total size exceeds ``max_size`` bytes.
+    """
+    INDEX_KEY = 'django-import-export-export-cache'
+
+    def __init__(self, storage_class=TempFolderStorage, ttl=3600,
+                 max_size=100 * 1024 * 1024):
+        self.storage_class = storage_class
+        self.ttl = ttl
+        self.max_size = max_size
+
+    @staticmethod
+    def get_key(resource, file_format, queryset, version):
+        """
+        Returns key of export of ``queryset`` with ``resource`` to
+        ``file_format``, where ``version`` identifies the state of the data,
+        see ``Resource.get_export_version``.
+        """
+        sql, params = queryset.query.sql_with_params()
+        parts = [
+            '%s.%s' % (type(resource).__module__, type(resource).__name__),
+            repr(resource.export_fields),
+            '%s.%s' % (type(file_format).__module__,
+                       type(file_format).__name__),
+            # normalize whitespace of the query
+            ' '.join(sql.split()),
+            repr(params),
+            repr(version),
+        ]
+        return hashlib.sha1(force_bytes('\n'.join(parts))).hexdigest()
+
+    def get_index(self):
+        return cache.get(self.INDEX_KEY) or {}
+
+    def set_index(self, index):
+        cache.set(self.INDEX_KEY, index, self.ttl)
+
+    def open(self, key):
+        """
+        Returns binary file-like object with cached export or ``None``.
+        """
+        entry = self.get_index().get(key)
+        if entry is None or entry['created'] + self.ttl < time.time():
+            return None
+        try:
+            return self.storage_class(name=entry['name']).open_stream()
+        except (IOError, OSError):
+            # removed by sweep of temporary files
+            return None
+
+    def set(self, key, export_data):
+        """
+        Saves ``export_data`` returned by ``ExportMixin.get_export_stream``,
+        which is text, bytes, iterator of text chunks or file-like object.
+        """
+        size = [0]
+
+        def iter_chunks():
+            for chunk in iter_bytes(export_data):
+                size[0] += len(chunk)
+                yield chunk
+
+        storage = self.storage_class()
+        storage.save_chunks(iter_chunks())
+        index = self.get_index()
+        index[key] = {
+            'name': storage.name,
+            'size': size[0],
+            'created': time.time(),
+        }
+        self.evict(index, keep=key)
+        self.set_index(index)
+
+    def evict(self, index, keep=None):
+        """
+        Removes expired entries from ``index`` and the oldest ones, except
+        ``keep``, while their total size exceeds ``max_size``.
+        """
+        expires = time.time() - self.ttl
+        entries = sorted(index.items(), key=lambda item: item[1]['created'])
+        total = sum(entry['size'] for key, entry in entries)
+        for key, entry in entries:
+            if key == keep:
+                continue
+            if entry['created'] >= expires and (self.max_size is None or
+                                                total <= self.max_size):
+                continue
+            total -= entry['size']
+            del index[key]
+            try:
+                self.storage_class(name=entry['name']).remove()
+            except (IOError, OSError):
+                pass
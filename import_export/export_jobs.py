@@ -0,0 +1,125 @@
+from __future__ import unicode_literals
+
+import logging
+import threading
+import time
+import uuid
+from multiprocessing.pool import ThreadPool
+
+from django.core.cache import cache
+from django.db import connections
+
+from .export_cache import iter_bytes
+from .tmp_storages import TempFolderStorage
+
+try:
+    from django.utils.encoding import force_text
+except ImportError:
+    from django.utils.encoding import force_unicode as force_text
+
+logger = logging.getLogger(__name__)
+
+_pool_lock = threading.Lock()
+#: thread pool running export jobs of this process
+_pool = None
+
+
+def get_pool(workers):
+    """
+    Returns thread pool of this process running export jobs, created with
+    ``workers`` threads on first use.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPool(workers)
+        return _pool
+
+
+class ExportJob(object):
+    """
+    Export running in the background, whose file is saved with
+    ``storage_class``, one of ``tmp_storages`` classes.
+
+    Jobs are kept in the Django cache under their ``id`` for ``ttl``
+    seconds, so their status can be read by any process sharing the cache.
+    ``headers`` are set on the response sending the exported file.
+    """
+    CACHE_PREFIX = 'django-import-export-export-job-'
+
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+
+    def __init__(self, filename, content_type, user_id=None,
+                 storage_class=TempFolderStorage, ttl=86400, headers=None):
+        self.id = uuid.uuid4().hex
+        self.filename = filename
+        self.content_type = content_type
+        self.user_id = user_id
+        self.storage_class = storage_class
+        self.ttl = ttl
+        self.headers = headers or {}
+        self.status = self.PENDING
+        self.name = None
+        self.error = ''
+        self.created = time.time()
+
+    @classmethod
+    def get(cls, id):
+        """
+        Returns job with ``id`` or ``None`` if it is unknown or expired.
+        """
+        return cache.get(cls.CACHE_PREFIX + id)
+
+    def save(self):
+        cache.set(self.CACHE_PREFIX + self.id, self, self.ttl)
+
+    def is_finished(self):
+        return self.status in (self.DONE, self.FAILED)
+
+    def open_stream(self):
+        """
+        Returns binary file-like object with exported file of finished job.
+        """
+        return self.storage_class(name=self.name).open_stream()
+
+    def run(self, get_export_data):
+        """
+        Saves export data returned by ``get_export_data`` callable, see
+        ``ExportMixin.get_export_stream``, and records the outcome.
+        """
+        self.status = self.RUNNING
+        self.save()
+        try:
+            storage = self.storage_class()
+            storage.save_chunks(iter_bytes(get_export_data()))
+        except Exception as e:
+            logger.exception(e)
+            self.status = self.FAILED
+            self.error = force_text(e)
+        else:
+            self.name = storage.name
+            self.status = self.DONE
+        self.save()
+
+    def run_in_thread(self, get_export_data):
+        try:
+            self.run(get_export_data)
+        finally:
+            # connections are opened per thread and not closed by the
+            # request cycle
+            for connection in connections.all():
+                connection.close()
+
+    def start(self, get_export_data, workers):
+        """
+        Runs the job in the thread pool of this process with ``workers``
+        threads, or in the current thread if ``workers`` is 0.
+        """
+        self.save()
+        if not workers:
+            self.run(get_export_data)
+            return
+        get_pool(workers).apply_async(self.run_in_thread, (get_export_data,))
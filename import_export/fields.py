@@ -26,17 +26,23 @@ class Field(object):
 
     ``default`` value returned by :meth`clean` if returned value evaluates to
     False
+
+    ``expression`` ORM expression, ie. ``Count('book')``, that
+    ``ModelResource`` annotates on exported querysets as ``attribute``
+    (defaults to field name), so the value is computed by the database.
+    Fields with expression are read-only.
     """
 
     def __init__(self, attribute=None, column_name=None, widget=None,
-                 default=None, readonly=False):
+                 default=None, readonly=False, expression=None):
         self.attribute = attribute
         self.default = default
         self.column_name = column_name
         if not widget:
             widget = widgets.Widget()
         self.widget = widget
-        self.readonly = readonly
+        self.expression = expression
+        self.readonly = readonly or expression is not None
 
     def __repr__(self):
         """
@@ -60,10 +66,15 @@ class Field(object):
                            "columns are: %s" % (self.column_name,
                                                 list(data.keys())))
 
-        try:
-            value = self.widget.clean(value)
-        except ValueError as e:
-            raise ValueError("Column '%s': %s" % (self.column_name, e))
+        cleaned = getattr(data, 'cleaned', None)
+        if cleaned is not None and self.column_name in cleaned:
+            # cleaned column-wise by ``Resource.clean_rows``
+            value = cleaned[self.column_name]
+        else:
+            try:
+                value = self.widget.clean(value)
+            except ValueError as e:
+                raise ValueError("Column '%s': %s" % (self.column_name, e))
 
         if not value and self.default != NOT_PROVIDED:
             if callable(self.default):
@@ -117,3 +128,14 @@ class Field(object):
         if value is None:
             return ""
         return self.widget.render(value)
+
+    def export_typed(self, obj):
+        """
+        Returns value from the provided object converted with widget's
+        ``render_typed``, for formats storing typed values. ``None`` is
+        kept.
+        """
+        value = self.get_value(obj)
+        if value is None:
+            return None
+        return self.widget.render_typed(value)
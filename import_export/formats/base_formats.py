@@ -2,9 +2,19 @@ from __future__ import unicode_literals
 from django.utils.six import moves
 import tempfile
 
+import codecs
+import csv
+import datetime
+import io
+import json
+import locale
+import mmap
+import os
+from itertools import chain, islice
+from multiprocessing.pool import ThreadPool
+import shutil
 import sys
 import warnings
-import datetime
 import tablib
 
 try:
@@ -37,36 +47,368 @@ except ImportError:
         warnings.warn(xlsx_warning, ImportWarning)
         XLSX_IMPORT = False
 
+try:
+    import pyarrow
+    import pyarrow.parquet
+
+    PARQUET_IMPORT = True
+except ImportError:
+    PARQUET_IMPORT = False
+
 try:
     from importlib import import_module
 except ImportError:
     from django.utils.importlib import import_module
 
+from django.core.serializers.json import DjangoJSONEncoder
 from django.utils import six
+from django.conf import settings
+from django.utils.encoding import force_text
+
+try:
+    from collections import OrderedDict
+except ImportError:
+    from django.utils.datastructures import SortedDict as OrderedDict
+
+#: size in bytes of chunks read from streams
+CHUNK_SIZE = 64 * 1024
+#: size in bytes of the beginning of a file passed to ``Format.sniff``
+SNIFF_SIZE = 4 * 1024
+#: number of threads parsing sheets in ``Format.create_datasets_from_stream``
+SHEET_WORKERS = 4
+
+ZIP_MAGIC = b'PK\x03\x04'
+OLE_MAGIC = b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1'
+UTF8_BOM = b'\xef\xbb\xbf'
+
+
+def iter_text_chunks(stream, encoding, chunk_size=CHUNK_SIZE):
+    """
+    Reads binary ``stream`` in chunks and yields them decoded with universal
+    newlines, as if the file was opened in ``'rU'`` mode.
+    """
+    decoder = io.IncrementalNewlineDecoder(
+        codecs.getincrementaldecoder(encoding)(), translate=True)
+    while True:
+        chunk = stream.read(chunk_size)
+        text = decoder.decode(chunk, final=not chunk)
+        if text:
+            yield text
+        if not chunk:
+            break
+
+
+def iter_text_lines(stream, encoding, chunk_size=CHUNK_SIZE):
+    """
+    Yields decoded lines of binary ``stream``, including the trailing
+    ``'\\n'``.
+    """
+    pending = ''
+    for text in iter_text_chunks(stream, encoding, chunk_size):
+        lines = (pending + text).split('\n')
+        pending = lines.pop()
+        for line in lines:
+            yield line + '\n'
+    if pending:
+        yield pending
+
+
+def iter_joined(texts, chunk_size=CHUNK_SIZE):
+    """
+    Yields ``texts`` joined into chunks of at least ``chunk_size``
+    characters, except the last one.
+    """
+    pending = []
+    size = 0
+    for text in texts:
+        pending.append(text)
+        size += len(text)
+        if size >= chunk_size:
+            yield ''.join(pending)
+            pending = []
+            size = 0
+    if pending:
+        yield ''.join(pending)
+
+
+def is_text(head):
+    """
+    Returns if ``head`` bytes look like text rather than binary data.
+    """
+    return bool(head) and b'\x00' not in head
+
+
+def seekable_stream(stream):
+    """
+    Returns ``stream`` if it can seek, otherwise its copy in a temporary
+    file. Needed by readers of zip based formats.
+    """
+    if getattr(stream, 'seekable', lambda: True)():
+        return stream
+    tmp_file = tempfile.SpooledTemporaryFile(max_size=CHUNK_SIZE * 16)
+    shutil.copyfileobj(stream, tmp_file, CHUNK_SIZE)
+    tmp_file.seek(0)
+    return tmp_file
+
+
+def mmap_stream(stream):
+    """
+    Returns read-only memory map of file ``stream``. Streams that are not
+    backed by a file descriptor are copied to a temporary file first.
+    """
+    try:
+        fileno = stream.fileno()
+    except (AttributeError, IOError, OSError, ValueError):
+        tmp_file = tempfile.TemporaryFile()
+        shutil.copyfileobj(stream, tmp_file, CHUNK_SIZE)
+        tmp_file.flush()
+        fileno = tmp_file.fileno()
+        try:
+            return mmap.mmap(fileno, 0, access=mmap.ACCESS_READ)
+        finally:
+            tmp_file.close()
+    return mmap.mmap(fileno, 0, access=mmap.ACCESS_READ)
+
+
+class RowStream(object):
+    """
+    Dataset-like object reading rows of a file lazily.
+
+    ``iter_rows`` is a callable returning iterator over rows of the file,
+    first being headers. It is called on every iteration, so only the
+    current row is kept in memory and rows can be iterated more than once
+    (ie. by ``CachedInstanceLoader`` and ``import_data``).
+    Empty rows are skipped like in tablib.
+    """
+
+    def __init__(self, iter_rows):
+        self.iter_rows = iter_rows
+        self._headers = None
+
+    @property
+    def headers(self):
+        if self._headers is None:
+            rows = self.iter_rows()
+            try:
+                self._headers = list(next(rows, []))
+            finally:
+                rows.close()
+        return self._headers
+
+    def __iter__(self):
+        """
+        Yields data rows as tuples.
+        """
+        rows = self.iter_rows()
+        try:
+            headers = next(rows, None)
+            if headers is None:
+                return
+            self._headers = list(headers)
+            for index, row in enumerate(rows, 2):
+                if not row:
+                    continue
+                if len(row) != len(headers):
+                    raise ValueError(
+                        "Row %s has %s columns, header has %s" % (
+                            index, len(row), len(headers)))
+                yield tuple(row)
+        finally:
+            rows.close()
+
+    @property
+    def dict(self):
+        """
+        Yields rows as ``OrderedDict`` keyed by headers.
+        """
+        for row in self:
+            yield OrderedDict(zip(self._headers, row))
+
+
+class DatasetChain(object):
+    """
+    Dataset-like object with rows of several datasets, ie. sheets of
+    a workbook, to pass to ``Resource.import_data``.
+
+    ``headers`` are headers of all datasets in order of appearance.
+    """
+
+    def __init__(self, datasets):
+        self.datasets = list(datasets)
+
+    @property
+    def headers(self):
+        headers = []
+        for dataset in self.datasets:
+            headers.extend(h for h in dataset.headers or []
+                           if h not in headers)
+        return headers
+
+    @property
+    def dict(self):
+        """
+        Yields rows of all datasets as dicts keyed by their headers.
+        """
+        return chain.from_iterable(dataset.dict for dataset in self.datasets)
+
+    def __len__(self):
+        return sum(len(dataset) for dataset in self.datasets)
+
+
+def concatenate_datasets(datasets):
+    """
+    Returns list of datasets where datasets with matching headers are
+    concatenated into the first of them.
+    """
+    groups = OrderedDict()
+    for dataset in datasets:
+        key = tuple(dataset.headers or ())
+        if key in groups:
+            for row in dataset:
+                groups[key].append(row)
+        else:
+            groups[key] = dataset
+    return list(groups.values())
+
+
+def map_sheets(func, sheets):
+    """
+    Returns list of ``func`` results for every sheet in ``sheets``, calling
+    it concurrently in ``SHEET_WORKERS`` threads.
+    """
+    sheets = list(sheets)
+    if len(sheets) < 2:
+        return [func(sheet) for sheet in sheets]
+    pool = ThreadPool(min(SHEET_WORKERS, len(sheets)))
+    try:
+        return pool.map(func, sheets)
+    finally:
+        pool.close()
+        pool.join()
 
 
 class Format(object):
     def get_title(self):
         return type(self)
 
+    @classmethod
+    def sniff(cls, head):
+        """
+        Returns if ``head``, the first ``SNIFF_SIZE`` bytes of a file, looks
+        like content of this format.
+
+        Default implementation returns ``False``.
+        """
+        return False
+
+    @classmethod
+    def can_sniff(cls):
+        """
+        Returns if the format implements ``sniff``.
+        """
+        return cls.sniff.__func__ is not Format.sniff.__func__
+
     def create_dataset(self, in_stream):
         """
         Create dataset from given string.
         """
         raise NotImplementedError()
 
+    def create_dataset_from_stream(self, stream, encoding=None):
+        """
+        Create dataset from given binary file-like object.
+
+        ``encoding`` is used to decode text formats.
+        Default implementation reads whole stream and calls
+        ``create_dataset``.
+        """
+        return self.create_dataset(stream.read())
+
+    def create_row_stream(self, open_stream, encoding=None):
+        """
+        Returns dataset-like object to pass to ``Resource.import_data``.
+
+        ``open_stream`` is a callable returning binary file-like object,
+        ie. ``BaseStorage.open_stream``. Formats that can read rows lazily
+        return an object providing ``headers`` and ``dict`` that reads the
+        file on every iteration. Default implementation returns dataset
+        created with ``create_dataset_from_stream``.
+        """
+        with open_stream() as stream:
+            return self.create_dataset_from_stream(stream, encoding)
+
+    def can_import_sheets(self):
+        """
+        Returns if this format can import all sheets of a workbook with
+        ``create_datasets_from_stream``.
+        """
+        return False
+
+    def create_datasets_from_stream(self, stream, encoding=None,
+                                    concatenate=False):
+        """
+        Returns list of datasets, one for every sheet of the workbook in
+        binary file-like object ``stream``, with sheet name as ``title``.
+
+        If ``concatenate`` is ``True`` sheets with matching headers are
+        concatenated into one dataset. Default implementation returns
+        dataset created with ``create_dataset_from_stream``.
+        """
+        return [self.create_dataset_from_stream(stream, encoding)]
+
     def export_data(self, dataset):
         """
         Returns format representation for given dataset.
         """
         raise NotImplementedError()
 
+    def can_export_chunks(self):
+        """
+        Returns if this format can export rows with ``export_chunks``.
+        """
+        return False
+
+    def export_chunks(self, headers, rows, write_headers=True):
+        """
+        Yields text chunks of format representation of ``headers`` and
+        iterable of ``rows``, consuming ``rows`` as the chunks are
+        iterated.
+
+        Formats with a header line omit it if ``write_headers`` is
+        ``False``, so chunks can be appended to a previous export.
+        """
+        raise NotImplementedError()
+
+    def can_export_stream(self):
+        """
+        Returns if this format can export rows with ``export_stream``.
+        """
+        return False
+
+    def export_stream(self, headers, rows, types=None):
+        """
+        Returns binary file-like object, positioned at the start, with format
+        representation of ``headers`` and iterable of ``rows``.
+
+        ``types`` is list of python types of columns returned by
+        ``Resource.get_export_types``, used by typed formats.
+        """
+        raise NotImplementedError()
+
     def is_binary(self):
         """
         Returns if this format is binary.
         """
         return True
 
+    def is_typed(self):
+        """
+        Returns if this format stores typed values, so exported rows should
+        keep python values of numbers, booleans and dates, see
+        ``Resource.iter_export``.
+        """
+        return False
+
     def get_read_mode(self):
         """
         Returns mode for opening files.
@@ -79,6 +421,13 @@ class Format(object):
         """
         return ""
 
+    def get_import_extensions(self):
+        """
+        Returns extensions of files of this format, used to guess format of
+        uploaded files. Default implementation returns ``get_extension``.
+        """
+        return [self.get_extension()]
+
     def get_content_type(self):
         # For content types see
         # http://www.iana.org/assignments/media-types/media-types.xhtml
@@ -138,10 +487,21 @@ class TextFormat(TablibFormat):
     def is_binary(self):
         return False
 
+    def get_encoding(self, encoding=None):
+        """
+        Returns ``encoding`` or encoding used for files opened in text mode.
+        """
+        return encoding or locale.getpreferredencoding(False)
+
+    def create_dataset_from_stream(self, stream, encoding=None):
+        text = ''.join(iter_text_chunks(stream, self.get_encoding(encoding)))
+        return self.create_dataset(text)
+
 
 class CSV(TextFormat):
     TABLIB_MODULE = 'tablib.formats._csv'
     CONTENT_TYPE = 'text/csv'
+    DELIMITER = ','
 
     def create_dataset(self, in_stream):
         if sys.version_info[0] < 3:
@@ -149,11 +509,210 @@ class CSV(TextFormat):
             return super(CSV, self).create_dataset(in_stream.encode('utf-8'))
         return super(CSV, self).create_dataset(in_stream)
 
+    @classmethod
+    def sniff(cls, head):
+        if head.startswith(UTF8_BOM):
+            head = head[len(UTF8_BOM):]
+        # the sniffer finds commas of JSON documents as delimiters
+        if not is_text(head) or head.lstrip()[:1] in (b'[', b'{'):
+            return False
+        # cut at the last line break, so a partial line does not confuse
+        # the sniffer, and decode as latin-1 which never fails
+        sample = head[:head.rfind(b'\n') + 1] or head
+        try:
+            dialect = csv.Sniffer().sniff(sample.decode('latin-1'),
+                                          delimiters=str(',\t;|'))
+        except csv.Error:
+            return False
+        return dialect.delimiter == cls.DELIMITER
+
+    def iter_csv_rows(self, stream, encoding=None):
+        """
+        Yields rows of binary ``stream`` as lists of strings, decoding it
+        incrementally.
+        """
+        lines = iter_text_lines(stream, self.get_encoding(encoding))
+        if sys.version_info[0] < 3:
+            # python 2.7 csv does not do unicode
+            lines = (line.encode('utf-8') for line in lines)
+            for row in csv.reader(lines, delimiter=str(self.DELIMITER)):
+                yield [cell.decode('utf-8') for cell in row]
+        else:
+            for row in csv.reader(lines, delimiter=self.DELIMITER):
+                yield row
+
+    def create_dataset_from_stream(self, stream, encoding=None):
+        dataset = tablib.Dataset()
+        for i, row in enumerate(self.iter_csv_rows(stream, encoding)):
+            if i == 0:
+                dataset.headers = row
+            elif row:
+                dataset.append(row)
+        return dataset
+
+    def create_row_stream(self, open_stream, encoding=None):
+        def iter_rows():
+            with open_stream() as stream:
+                for row in self.iter_csv_rows(stream, encoding):
+                    yield row
+        return RowStream(iter_rows)
+
+    def can_export_chunks(self):
+        return True
+
+    def iter_csv_lines(self, headers, rows, write_headers=True):
+        """
+        Yields lines of ``headers`` and ``rows`` written with ``csv.writer``.
+        """
+        if write_headers:
+            rows = chain([headers], rows)
+        if sys.version_info[0] < 3:
+            # python 2.7 csv does not do unicode
+            buffer = io.BytesIO()
+            writer = csv.writer(buffer, delimiter=str(self.DELIMITER))
+            for row in rows:
+                writer.writerow([
+                    value.encode('utf-8')
+                    if isinstance(value, six.text_type) else value
+                    for value in row])
+                yield buffer.getvalue().decode('utf-8')
+                buffer.seek(0)
+                buffer.truncate()
+        else:
+            buffer = io.StringIO()
+            writer = csv.writer(buffer, delimiter=self.DELIMITER)
+            for row in rows:
+                writer.writerow(row)
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+
+    def export_chunks(self, headers, rows, write_headers=True):
+        return iter_joined(self.iter_csv_lines(headers, rows, write_headers))
+
 
 class JSON(TextFormat):
     TABLIB_MODULE = 'tablib.formats._json'
     CONTENT_TYPE = 'application/json'
 
+    @classmethod
+    def sniff(cls, head):
+        if head.startswith(UTF8_BOM):
+            head = head[len(UTF8_BOM):]
+        # single object on one line is both JSON and NDJSON
+        return (is_text(head) and head.lstrip()[:1] in (b'[', b'{') and
+                not (NDJSON.sniff(head) and b'\n' in head.strip()))
+
+
+class NDJSON(TextFormat):
+    """
+    Newline delimited JSON, one object per line, keys of the first object
+    being the headers.
+
+    Imports are parsed line by line and exports written line by line, so
+    neither needs the whole document in memory.
+    """
+    CONTENT_TYPE = 'application/x-ndjson'
+
+    def get_title(self):
+        return 'ndjson'
+
+    def get_extension(self):
+        return 'ndjson'
+
+    def get_import_extensions(self):
+        return ['ndjson', 'jsonl']
+
+    def can_import(self):
+        return True
+
+    def can_export(self):
+        return True
+
+    @classmethod
+    def sniff(cls, head):
+        if head.startswith(UTF8_BOM):
+            head = head[len(UTF8_BOM):]
+        if not is_text(head):
+            return False
+        # a partial first line, cut at SNIFF_SIZE, does not parse
+        line = head.lstrip().partition(b'\n')[0]
+        if not line.startswith(b'{'):
+            return False
+        try:
+            return isinstance(json.loads(line.decode('utf-8')), dict)
+        except ValueError:
+            return False
+
+    def iter_ndjson_rows(self, lines):
+        """
+        Yields headers and rows, as lists, of JSON objects in ``lines``.
+
+        Values of keys missing in an object are ``None``, keys not present
+        in the first object are ignored.
+        """
+        headers = None
+        for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+            obj = json.loads(line, object_pairs_hook=OrderedDict)
+            if headers is None:
+                headers = list(obj.keys())
+                yield headers
+            yield [obj.get(header) for header in headers]
+
+    def create_dataset_from_rows(self, rows):
+        dataset = tablib.Dataset()
+        dataset.headers = next(rows, None)
+        for row in rows:
+            dataset.append(row)
+        return dataset
+
+    def create_dataset(self, in_stream):
+        lines = in_stream.splitlines()
+        return self.create_dataset_from_rows(self.iter_ndjson_rows(lines))
+
+    def create_dataset_from_stream(self, stream, encoding=None):
+        lines = iter_text_lines(stream, self.get_encoding(encoding))
+        return self.create_dataset_from_rows(self.iter_ndjson_rows(lines))
+
+    def create_row_stream(self, open_stream, encoding=None):
+        def iter_rows():
+            with open_stream() as stream:
+                lines = iter_text_lines(stream, self.get_encoding(encoding))
+                for row in self.iter_ndjson_rows(lines):
+                    yield row
+        return RowStream(iter_rows)
+
+    def iter_lines(self, headers, rows):
+        """
+        Yields lines, with trailing ``'\\n'``, of JSON objects for ``rows``.
+        """
+        for row in rows:
+            yield force_text(json.dumps(OrderedDict(zip(headers, row)),
+                                        cls=DjangoJSONEncoder,
+                                        ensure_ascii=False)) + '\n'
+
+    def export_data(self, dataset):
+        return ''.join(self.iter_lines(dataset.headers, dataset))
+
+    def can_export_chunks(self):
+        return True
+
+    def export_chunks(self, headers, rows, write_headers=True):
+        return iter_joined(self.iter_lines(headers, rows))
+
+    def can_export_stream(self):
+        return True
+
+    def export_stream(self, headers, rows, types=None):
+        tmp_file = tempfile.SpooledTemporaryFile(max_size=CHUNK_SIZE * 16)
+        for line in self.iter_lines(headers, rows):
+            tmp_file.write(line.encode('utf-8'))
+        tmp_file.seek(0)
+        return tmp_file
+
 
 class YAML(TextFormat):
     TABLIB_MODULE = 'tablib.formats._yaml'
@@ -161,15 +720,22 @@ class YAML(TextFormat):
     CONTENT_TYPE = 'text/yaml'
 
 
-class TSV(TextFormat):
+class TSV(CSV):
     TABLIB_MODULE = 'tablib.formats._tsv'
     CONTENT_TYPE = 'text/tab-separated-values'
+    DELIMITER = '\t'
 
 
 class ODS(TextFormat):
     TABLIB_MODULE = 'tablib.formats._ods'
     CONTENT_TYPE = 'application/vnd.oasis.opendocument.spreadsheet'
 
+    @classmethod
+    def sniff(cls, head):
+        # first, uncompressed entry of ODS files is the ``mimetype`` file
+        return (head.startswith(ZIP_MAGIC) and
+                cls.CONTENT_TYPE.encode('ascii') in head[:128])
+
 
 class HTML(TextFormat):
     TABLIB_MODULE = 'tablib.formats._html'
@@ -183,39 +749,120 @@ class XLS(TablibFormat):
     def can_import(self):
         return XLS_IMPORT
 
+    @classmethod
+    def sniff(cls, head):
+        return head.startswith(OLE_MAGIC)
+
     def create_dataset(self, in_stream):
         """
         Create dataset from first sheet.
         """
-        assert XLS_IMPORT
+        xls_book = self.open_workbook(file_contents=in_stream)
+        return self.create_dataset_from_rows(self.iter_xls_rows(xls_book))
 
-        xls_book = xlrd.open_workbook(file_contents=in_stream)
-        dataset = tablib.Dataset()
+    def create_dataset_from_stream(self, stream, encoding=None):
+        """
+        Create dataset from first sheet, reading the workbook through memory
+        map of ``stream``.
+        """
+        contents = mmap_stream(stream)
+        try:
+            xls_book = self.open_workbook(file_contents=contents)
+            return self.create_dataset_from_rows(
+                self.iter_xls_rows(xls_book))
+        finally:
+            contents.close()
 
-        sheet = xls_book.sheets()[0]
+    def create_row_stream(self, open_stream, encoding=None):
+        def iter_rows():
+            with open_stream() as stream:
+                contents = mmap_stream(stream)
+            try:
+                xls_book = self.open_workbook(file_contents=contents)
+                for row in self.iter_xls_rows(xls_book):
+                    yield row
+            finally:
+                contents.close()
+        return RowStream(iter_rows)
+
+    def can_import_sheets(self):
+        return XLS_IMPORT
 
-        dataset.headers = sheet.row_values(0)
+    def create_datasets_from_stream(self, stream, encoding=None,
+                                    concatenate=False):
+        """
+        Create dataset from every sheet, sheets are parsed concurrently, each
+        from its own workbook opened on the same memory map.
+        """
+        contents = mmap_stream(stream)
+        try:
+            xls_book = self.open_workbook(file_contents=contents)
+            sheet_names = xls_book.sheet_names()
 
-        for i in moves.range(1, sheet.nrows):
-            row = []
-            for c in xrange(sheet.ncols):
-                cell = sheet.cell(i, c)
-                cell_value = cell.value
+            def create_sheet_dataset(index):
+                xls_book = self.open_workbook(file_contents=contents)
+                dataset = self.create_dataset_from_rows(
+                    self.iter_xls_rows(xls_book, index))
+                dataset.title = sheet_names[index]
+                return dataset
 
-                if cell.ctype == xlrd.XL_CELL_NUMBER and int(cell_value) == cell_value:
-                    cell_value = int(cell_value)
+            datasets = map_sheets(create_sheet_dataset,
+                                  range(len(sheet_names)))
+        finally:
+            contents.close()
+        if concatenate:
+            datasets = concatenate_datasets(datasets)
+        return datasets
 
-                elif cell.ctype == xlrd.XL_CELL_DATE:
-                    dt_tuple = xlrd.xldate_as_tuple(cell_value, xls_book.datemode)
-                    # Create datetime object from this tuple.
-                    cell_value = datetime.datetime(
-                            dt_tuple[0], dt_tuple[1], dt_tuple[2],
-                            dt_tuple[3], dt_tuple[4], dt_tuple[5]
-                    )
-                row.append(cell_value)
+    def create_dataset_from_rows(self, rows):
+        dataset = tablib.Dataset()
+        dataset.headers = next(rows, None)
+        for row in rows:
             dataset.append(row)
         return dataset
 
+    def open_workbook(self, **kwargs):
+        """
+        Opens workbook with ``xlrd``, loading sheets on demand.
+        """
+        assert XLS_IMPORT
+        return xlrd.open_workbook(on_demand=True, **kwargs)
+
+    def iter_xls_rows(self, xls_book, sheet_index=0):
+        """
+        Yields rows of sheet ``sheet_index`` of ``xls_book`` as lists of cell
+        values.
+
+        Whole rows are read with ``row_values`` and ``row_types``, integral
+        numbers are converted to ``int`` and dates to ``datetime``.
+        """
+        try:
+            sheet = xls_book.sheet_by_index(sheet_index)
+            if not sheet.nrows:
+                return
+            yield sheet.row_values(0)
+
+            number_type = xlrd.XL_CELL_NUMBER
+            date_type = xlrd.XL_CELL_DATE
+            datemode = xls_book.datemode
+            for i in moves.range(1, sheet.nrows):
+                row = sheet.row_values(i)
+                types = sheet.row_types(i)
+                if number_type in types:
+                    row = [int(value) if type_ == number_type and
+                           int(value) == value else value
+                           for value, type_ in zip(row, types)]
+                if date_type in types:
+                    for c, type_ in enumerate(types):
+                        if type_ == date_type:
+                            row[c] = xlrd.xldate.xldate_as_datetime(
+                                row[c], datemode)
+                yield row
+        finally:
+            # release_resources would close the memory map shared with
+            # other sheets, it is closed by the caller
+            xls_book.unload_sheet(sheet_index)
+
 
 class XLSX(TablibFormat):
     TABLIB_MODULE = 'tablib.formats._xlsx'
@@ -224,29 +871,317 @@ class XLSX(TablibFormat):
     def can_import(self):
         return XLSX_IMPORT
 
+    @classmethod
+    def sniff(cls, head):
+        if not head.startswith(ZIP_MAGIC) or ODS.sniff(head):
+            return False
+        return any(name in head for name in (
+            b'[Content_Types].xml', b'_rels/', b'xl/', b'docProps/'))
+
     def create_dataset(self, in_stream):
         """
         Create dataset from first sheet.
         """
-        assert XLSX_IMPORT
-        from io import BytesIO
-        xlsx_book = openpyxl.load_workbook(BytesIO(in_stream))
+        return self.create_dataset_from_stream(io.BytesIO(in_stream))
 
+    def create_dataset_from_stream(self, stream, encoding=None):
+        """
+        Create dataset from first sheet.
+        """
         dataset = tablib.Dataset()
-        sheet = xlsx_book.active
+        rows = self.iter_xlsx_rows(stream)
+        dataset.headers = next(rows, None)
+        for row in rows:
+            dataset.append(row)
+        return dataset
 
-        dataset.headers = [cell.value for cell in sheet.rows[0]]
+    def create_row_stream(self, open_stream, encoding=None):
+        def iter_rows():
+            with open_stream() as stream:
+                for row in self.iter_xlsx_rows(stream):
+                    yield row
+        return RowStream(iter_rows)
 
-        for i in moves.range(1, len(sheet.rows)):
-            row = []
-            for c in xrange(sheet.get_highest_column()):
-                cell = sheet.cell(row=i, column=c)
-                cell_value = cell.value
+    def can_import_sheets(self):
+        return XLSX_IMPORT
+
+    def create_datasets_from_stream(self, stream, encoding=None,
+                                    concatenate=False):
+        """
+        Create dataset from every sheet, sheets are parsed concurrently, each
+        from its own read-only workbook opened on its own handle of the file,
+        so the workbook is never read into memory. Streams not backed by a
+        file are copied to a temporary file first.
+        """
+        assert XLSX_IMPORT
+        stream = seekable_stream(stream)
+        xlsx_book = openpyxl.load_workbook(stream, read_only=True)
+        sheet_names = xlsx_book.sheetnames
+        if hasattr(xlsx_book, 'close'):
+            xlsx_book.close()
+
+        path = getattr(stream, 'name', None)
+        tmp_path = None
+        if not isinstance(path, six.string_types) or not os.path.isfile(path):
+            stream.seek(0)
+            with tempfile.NamedTemporaryFile(delete=False) as tmp_file:
+                shutil.copyfileobj(stream, tmp_file, CHUNK_SIZE)
+            path = tmp_path = tmp_file.name
+
+        def create_sheet_dataset(sheet_name):
+            dataset = tablib.Dataset()
+            with open(path, 'rb') as sheet_stream:
+                rows = self.iter_xlsx_rows(sheet_stream, sheet_name)
+                dataset.headers = next(rows, None)
+                for row in rows:
+                    dataset.append(row)
+            dataset.title = sheet_name
+            return dataset
+
+        try:
+            datasets = map_sheets(create_sheet_dataset, sheet_names)
+        finally:
+            if tmp_path is not None:
+                os.remove(tmp_path)
+        if concatenate:
+            datasets = concatenate_datasets(datasets)
+        return datasets
+
+    def iter_xlsx_rows(self, stream, sheet_name=None):
+        """
+        Yields rows of sheet ``sheet_name``, by default the active sheet, of
+        workbook in ``stream`` as lists of cell values, loading the workbook
+        in read-only mode.
+
+        Rows are padded or cut to the number of header cells and integral
+        floats are converted to ``int``.
+        """
+        assert XLSX_IMPORT
+        xlsx_book = openpyxl.load_workbook(seekable_stream(stream),
+                                           read_only=True)
+        try:
+            if sheet_name is None:
+                sheet = xlsx_book.active
+            else:
+                sheet = xlsx_book[sheet_name]
+            rows = self.iter_sheet_values(sheet)
+            headers = next(rows, None)
+            if headers is None:
+                return
+            width = len(headers)
+            yield headers
+            for row in rows:
+                row = [int(value) if isinstance(value, float) and
+                       value.is_integer() else value
+                       for value in row[:width]]
+                if len(row) < width:
+                    row.extend([None] * (width - len(row)))
+                yield row
+        finally:
+            # read-only workbooks keep the archive open, close is not
+            # available in older openpyxl versions
+            if hasattr(xlsx_book, 'close'):
+                xlsx_book.close()
+
+    def can_export_stream(self):
+        return XLSX_IMPORT
+
+    def export_stream(self, headers, rows, types=None):
+        """
+        Writes rows to openpyxl write-only workbook, which keeps them in a
+        temporary file, and saves the workbook to a spooled temporary file.
+        """
+        xlsx_book = openpyxl.Workbook(write_only=True)
+        sheet = xlsx_book.create_sheet()
+        sheet.append(headers)
+        for row in rows:
+            sheet.append(row)
+        tmp_file = tempfile.SpooledTemporaryFile(max_size=CHUNK_SIZE * 16)
+        xlsx_book.save(tmp_file)
+        tmp_file.seek(0)
+        return tmp_file
+
+    def iter_sheet_values(self, sheet):
+        try:
+            rows = sheet.iter_rows(values_only=True)
+        except TypeError:
+            # values_only is supported since openpyxl 2.6
+            return ([cell.value for cell in row] for row in sheet.iter_rows())
+        return (list(row) for row in rows)
+
+
+class Parquet(Format):
+    """
+    Apache Parquet columnar format, available when ``pyarrow`` is installed.
+
+    Exported rows are written in record batches of ``BATCH_SIZE`` rows, with
+    column types given by the resource (``Resource.get_export_types``) or
+    inferred from the first batch, and imports are read row group by row
+    group. Numbers, booleans and dates are stored typed.
+    """
+    CONTENT_TYPE = 'application/vnd.apache.parquet'
+    BATCH_SIZE = 10000
+    MAGIC = b'PAR1'
+
+    def get_title(self):
+        return 'parquet'
+
+    def get_extension(self):
+        return 'parquet'
+
+    def get_content_type(self):
+        return self.CONTENT_TYPE
+
+    def can_import(self):
+        return PARQUET_IMPORT
 
-                if (cell.data_type == cell.TYPE_NUMERIC
-                    and isinstance(cell_value, (int, float, basestring))
-                    and int(cell_value) == cell_value):
-                    cell_value = int(cell_value)
-                row.append(cell_value)
+    def can_export(self):
+        return PARQUET_IMPORT
+
+    def is_typed(self):
+        return True
+
+    @classmethod
+    def sniff(cls, head):
+        return head.startswith(cls.MAGIC)
+
+    def create_dataset(self, in_stream):
+        return self.create_dataset_from_stream(io.BytesIO(in_stream))
+
+    def create_dataset_from_stream(self, stream, encoding=None):
+        dataset = tablib.Dataset()
+        rows = self.iter_parquet_rows(stream)
+        dataset.headers = next(rows, None)
+        for row in rows:
             dataset.append(row)
         return dataset
+
+    def create_row_stream(self, open_stream, encoding=None):
+        def iter_rows():
+            with open_stream() as stream:
+                for row in self.iter_parquet_rows(stream):
+                    yield row
+        return RowStream(iter_rows)
+
+    def iter_parquet_rows(self, stream):
+        """
+        Yields column names and rows of parquet file in ``stream``, reading
+        one row group at a time.
+        """
+        assert PARQUET_IMPORT
+        parquet_file = pyarrow.parquet.ParquetFile(seekable_stream(stream))
+        yield list(parquet_file.schema.names)
+        for i in moves.range(parquet_file.num_row_groups):
+            table = parquet_file.read_row_group(i)
+            columns = [column.to_pylist() for column in table.columns]
+            for row in zip(*columns):
+                yield list(row)
+
+    def get_arrow_type(self, column_type):
+        """
+        Returns arrow type for python ``column_type`` from
+        ``Resource.get_export_types``; unknown types are stored as strings.
+        """
+        if isinstance(column_type, tuple):
+            # (Decimal, max_digits, decimal_places)
+            return pyarrow.decimal128(column_type[1], column_type[2])
+        if column_type is datetime.datetime:
+            tz = 'UTC' if settings.USE_TZ else None
+            return pyarrow.timestamp('us', tz=tz)
+        arrow_types = {
+            int: pyarrow.int64(),
+            float: pyarrow.float64(),
+            bool: pyarrow.bool_(),
+            datetime.date: pyarrow.date32(),
+        }
+        return arrow_types.get(column_type, pyarrow.string())
+
+    def infer_arrow_type(self, values):
+        """
+        Returns arrow type inferred from ``values`` of a column, which may
+        be the first batch only. Columns with mixed or only empty values are
+        stored as strings and decimals are widened to 18 decimal places, so
+        later batches can be converted.
+        """
+        try:
+            column_type = pyarrow.array(list(values)).type
+        except (pyarrow.ArrowException, TypeError, ValueError):
+            return pyarrow.string()
+        if column_type == pyarrow.null():
+            return pyarrow.string()
+        if pyarrow.types.is_decimal(column_type):
+            integer_digits = column_type.precision - column_type.scale
+            scale = max(column_type.scale, min(18, 38 - integer_digits))
+            return pyarrow.decimal128(38, scale)
+        return column_type
+
+    def get_schema(self, headers, rows, types=None):
+        """
+        Returns ``pyarrow.Schema`` with columns of ``types``, or inferred
+        from ``rows`` when ``types`` are not given.
+        """
+        if types is not None:
+            arrow_types = [self.get_arrow_type(column_type)
+                           for column_type in types]
+        else:
+            columns = list(zip(*rows)) or [()] * len(headers)
+            arrow_types = [self.infer_arrow_type(values)
+                           for values in columns]
+        return pyarrow.schema([pyarrow.field(force_text(header), arrow_type)
+                               for header, arrow_type
+                               in zip(headers, arrow_types)])
+
+    def create_table(self, headers, rows, schema=None):
+        """
+        Returns ``pyarrow.Table`` with ``rows`` converted to ``schema``
+        (inferred with ``get_schema`` by default). Values of string columns
+        are converted to text.
+        """
+        if schema is None:
+            schema = self.get_schema(headers, rows)
+        columns = list(zip(*rows)) or [()] * len(headers)
+        arrays = []
+        for values, field in zip(columns, schema):
+            if field.type == pyarrow.string():
+                values = [None if value is None else force_text(value)
+                          for value in values]
+            arrays.append(pyarrow.array(list(values), type=field.type))
+        return pyarrow.Table.from_arrays(arrays, schema=schema)
+
+    def export_data(self, dataset):
+        return self.export_stream(dataset.headers, dataset).read()
+
+    def can_export_stream(self):
+        return PARQUET_IMPORT
+
+    def export_stream(self, headers, rows, types=None):
+        assert PARQUET_IMPORT
+        tmp_file = tempfile.SpooledTemporaryFile(max_size=CHUNK_SIZE * 16)
+        rows = iter(rows)
+        batch = list(islice(rows, self.BATCH_SIZE))
+        schema = self.get_schema(headers, batch, types)
+        writer = pyarrow.parquet.ParquetWriter(tmp_file, schema)
+        try:
+            while batch:
+                writer.write_table(self.create_table(headers, batch, schema))
+                batch = list(islice(rows, self.BATCH_SIZE))
+        finally:
+            writer.close()
+        tmp_file.seek(0)
+        return tmp_file
+
+
+def sniff_format(formats, head, preferred=None):
+    """
+    Returns first of ``formats`` whose ``sniff`` accepts ``head``, trying
+    ``preferred`` format first. ``preferred`` format that cannot tell its
+    content (see ``Format.can_sniff``) is returned as it is. Returns
+    ``None`` if no format matches.
+    """
+    if preferred is not None and (not preferred.can_sniff() or
+                                  preferred.sniff(head)):
+        return preferred
+    for format in formats:
+        if format.sniff(head):
+            return format
+    return None
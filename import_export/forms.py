@@ -8,6 +8,8 @@ from django.utils.translation import ugettext_lazy as _
 
 from jsonfield.fields import JSONFormField
 
+from .formats import base_formats
+
 
 class ImportForm(forms.Form):
     import_file = forms.FileField(
@@ -21,6 +23,7 @@ class ImportForm(forms.Form):
 
     def __init__(self, import_formats, *args, **kwargs):
         super(ImportForm, self).__init__(*args, **kwargs)
+        self.import_formats = import_formats
         choices = []
         for i, f in enumerate(import_formats):
             choices.append((str(i), f().get_title(),))
@@ -29,11 +32,33 @@ class ImportForm(forms.Form):
 
         self.fields['input_format'].choices = choices
 
+    def guess_input_format(self, import_file):
+        """
+        Returns index of the import format matching content of
+        ``import_file``, preferring the format its extension suggests.
+        """
+        extension = os.path.splitext(import_file.name.strip())[-1][1:].lower()
+        index = {t: i for i, t in self.fields['input_format'].choices}.get(extension)
+        if index is None and extension:
+            for i, f in enumerate(self.import_formats):
+                if extension in f().get_import_extensions():
+                    index = str(i)
+                    break
+        preferred = self.import_formats[int(index)] if index else None
+
+        import_file.seek(0)
+        head = import_file.read(base_formats.SNIFF_SIZE)
+        import_file.seek(0)
+        sniffed = base_formats.sniff_format(self.import_formats, head,
+                                            preferred)
+        if sniffed is not None:
+            return str(self.import_formats.index(sniffed))
+        return index
+
     def clean(self):
         data = self.cleaned_data
-        if not data['input_format']:
-            input_format = os.path.splitext(data['import_file'].name.strip())[-1][1:].lower()
-            data['input_format'] = {t: i for i, t in self.fields['input_format'].choices}.get(input_format)
+        if not data['input_format'] and data.get('import_file'):
+            data['input_format'] = self.guess_input_format(data['import_file'])
 
         if not data['input_format']:
             self.add_error('input_format', self.fields['input_format'].error_messages['required'])
@@ -44,12 +69,19 @@ class ConfirmImportForm(forms.Form):
     import_file_name = forms.CharField(widget=forms.HiddenInput())
     original_file_name = forms.CharField(widget=forms.HiddenInput())
     input_format = forms.CharField(widget=forms.HiddenInput())
+    import_plan_name = forms.CharField(widget=forms.HiddenInput(),
+                                       required=False)
 
     def clean_import_file_name(self):
         data = self.cleaned_data['import_file_name']
         data = os.path.basename(data)
         return data
 
+    def clean_import_plan_name(self):
+        data = self.cleaned_data['import_plan_name']
+        data = os.path.basename(data)
+        return data
+
 
 class PreImportForm(ConfirmImportForm):
     import_rule = JSONFormField(widget=forms.HiddenInput)
@@ -60,9 +92,31 @@ class ExportForm(forms.Form):
             label=_('Format'),
             choices=(),
     )
+    since = forms.CharField(
+            label=_('Changed since'),
+            required=False,
+            help_text=_('Export only rows changed after this watermark, '
+                        'returned by the previous export in the '
+                        'X-Export-Watermark header.'),
+    )
+    export_fields = forms.MultipleChoiceField(
+            label=_('Fields'),
+            required=False,
+            widget=forms.CheckboxSelectMultiple,
+            help_text=_('Export only selected fields, all fields when none '
+                        'is selected.'),
+    )
 
     def __init__(self, formats, *args, **kwargs):
+        fields = kwargs.pop('fields', None)
+        delta = kwargs.pop('delta', True)
         super(ExportForm, self).__init__(*args, **kwargs)
+        if not delta:
+            del self.fields['since']
+        if fields:
+            self.fields['export_fields'].choices = fields
+        else:
+            del self.fields['export_fields']
         choices = []
         for i, f in enumerate(formats):
             choices.append((str(i), f().get_title(),))
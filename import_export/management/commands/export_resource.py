@@ -0,0 +1,145 @@
+from __future__ import unicode_literals
+
+import importlib
+import io
+import os
+import shutil
+import sys
+from optparse import make_option
+
+import django
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import six
+
+from import_export.admin import DEFAULT_FORMATS
+
+
+class Command(BaseCommand):
+    help = ("Exports resource given by dotted path, optionally only rows "
+            "changed since a watermark (delta export).")
+    args = '<resource>'
+
+    if django.VERSION < (1, 8):
+        option_list = BaseCommand.option_list + (
+            make_option('--format', dest='format', default='csv'),
+            make_option('--output', dest='output', default=None),
+            make_option('--fields', dest='fields', default=None),
+            make_option('--since', dest='since', default=None),
+            make_option('--watermark-file', dest='watermark_file',
+                        default=None),
+            make_option('--deleted-output', dest='deleted_output',
+                        default=None),
+        )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'resource',
+            help="Dotted path of resource class, ie. "
+                 "myapp.resources.BookResource.")
+        parser.add_argument(
+            '--format', dest='format', default='csv',
+            help="Export format, ie. csv, json or xlsx.")
+        parser.add_argument(
+            '--output', dest='output', default=None,
+            help="File to write the export to, standard output by default.")
+        parser.add_argument(
+            '--fields', dest='fields', default=None,
+            help="Comma separated names of exported fields, all by default.")
+        parser.add_argument(
+            '--since', dest='since', default=None,
+            help="Export only rows changed after this watermark.")
+        parser.add_argument(
+            '--watermark-file', dest='watermark_file', default=None,
+            help="File the watermark is read from, unless --since is given, "
+                 "and where the new watermark is saved after export.")
+        parser.add_argument(
+            '--deleted-output', dest='deleted_output', default=None,
+            help="File to write keys of deleted objects to, one per line.")
+
+    def get_resource_class(self, path):
+        module_path, _, class_name = path.rpartition('.')
+        try:
+            return getattr(importlib.import_module(module_path), class_name)
+        except (ImportError, AttributeError, ValueError):
+            raise CommandError("Could not import resource '%s'" % path)
+
+    def get_format(self, title):
+        for format_class in DEFAULT_FORMATS:
+            file_format = format_class()
+            if file_format.get_title() == title and file_format.can_export():
+                return file_format
+        raise CommandError("Unknown export format '%s'" % title)
+
+    def write_export(self, resource, file_format, queryset, stream):
+        """
+        Writes export of ``queryset`` to binary ``stream``, rows are
+        serialized while iterated when ``file_format`` supports it.
+        """
+        headers = resource.get_export_headers()
+        if file_format.can_export_chunks():
+            for chunk in file_format.export_chunks(
+                    headers, resource.iter_export(queryset)):
+                stream.write(chunk.encode('utf-8'))
+        elif file_format.can_export_stream():
+            rows = resource.iter_export(queryset,
+                                        typed=file_format.is_typed())
+            export_data = file_format.export_stream(
+                headers, rows, resource.get_export_types())
+            try:
+                shutil.copyfileobj(export_data, stream)
+            finally:
+                export_data.close()
+        else:
+            export_data = file_format.export_data(resource.export(queryset))
+            if isinstance(export_data, six.text_type):
+                export_data = export_data.encode('utf-8')
+            stream.write(export_data)
+
+    def handle(self, *args, **options):
+        path = options.get('resource') or (args[0] if args else None)
+        if not path:
+            raise CommandError("Resource is required")
+        resource = self.get_resource_class(path)()
+        if options['fields']:
+            resource.export_fields = options['fields'].split(',')
+        file_format = self.get_format(options['format'])
+
+        since = options['since']
+        watermark_file = options['watermark_file']
+        if since is None and watermark_file and os.path.exists(
+                watermark_file):
+            with io.open(watermark_file, encoding='utf-8') as f:
+                since = f.read().strip() or None
+        try:
+            if since is not None:
+                since = resource.parse_watermark(since)
+        except ValidationError as e:
+            raise CommandError("Invalid watermark: %s" % ' '.join(e.messages))
+
+        queryset, watermark = resource.get_delta_queryset(
+            resource.get_queryset(), since)
+
+        if options['output']:
+            with open(options['output'], 'wb') as stream:
+                self.write_export(resource, file_format, queryset, stream)
+        else:
+            stream = getattr(sys.stdout, 'buffer', sys.stdout)
+            self.write_export(resource, file_format, queryset, stream)
+            stream.flush()
+
+        if options['deleted_output']:
+            deleted = []
+            if since is not None:
+                deleted = resource.get_deleted_keys(since, watermark)
+            with io.open(options['deleted_output'], 'w',
+                         encoding='utf-8') as f:
+                for key in deleted:
+                    f.write('%s\n' % key)
+
+        watermark = resource.format_watermark(watermark)
+        if watermark_file:
+            with io.open(watermark_file, 'w', encoding='utf-8') as f:
+                f.write(watermark)
+        if int(options.get('verbosity', 1)) >= 1:
+            self.stderr.write("Watermark: %s" % watermark)
@@ -0,0 +1,69 @@
+from __future__ import unicode_literals
+
+from optparse import make_option
+
+import django
+from django.contrib import admin
+from django.core.management.base import BaseCommand
+
+from import_export.admin import (
+    ImportMixin,
+    TMP_STORAGE_CLASS,
+    TMP_STORAGE_TTL,
+)
+
+
+class Command(BaseCommand):
+    help = ("Removes temporary import files older than "
+            "IMPORT_EXPORT_TMP_STORAGE_TTL seconds.")
+
+    if django.VERSION < (1, 8):
+        option_list = BaseCommand.option_list + (
+            make_option('--max-age', type='int', dest='max_age',
+                        default=None),
+            make_option('--batch-size', type='int', dest='batch_size',
+                        default=100),
+        )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--max-age', type=int, dest='max_age', default=None,
+            help="Remove files older than this many seconds.")
+        parser.add_argument(
+            '--batch-size', type=int, dest='batch_size', default=100,
+            help="Number of files removed in one batch.")
+
+    def get_tmp_storage_classes(self):
+        """
+        Returns default storage class and classes used by registered
+        ``ImportMixin`` admins.
+        """
+        tmp_storage_classes = [TMP_STORAGE_CLASS]
+        for model_admin in admin.site._registry.values():
+            if isinstance(model_admin, ImportMixin):
+                tmp_storage_class = model_admin.get_tmp_storage_class()
+                if tmp_storage_class not in tmp_storage_classes:
+                    tmp_storage_classes.append(tmp_storage_class)
+        return tmp_storage_classes
+
+    def handle(self, *args, **options):
+        max_age = options['max_age']
+        if max_age is None:
+            max_age = TMP_STORAGE_TTL
+        batch_size = options['batch_size']
+
+        for tmp_storage_class in self.get_tmp_storage_classes():
+            total = 0
+            while True:
+                try:
+                    removed = tmp_storage_class.sweep(max_age, batch_size)
+                except NotImplementedError:
+                    self.stderr.write("%s does not support sweeping" %
+                                      tmp_storage_class.__name__)
+                    break
+                total += removed
+                if removed < batch_size:
+                    break
+            if int(options.get('verbosity', 1)) >= 1:
+                self.stdout.write("%s: removed %d files" % (
+                    tmp_storage_class.__name__, total))
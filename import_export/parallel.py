@@ -0,0 +1,117 @@
+from __future__ import unicode_literals
+
+import multiprocessing
+
+from django.db import connections
+from django.utils.six.moves import cPickle as pickle
+
+
+def get_pk_ranges(queryset, partitions):
+    """
+    Returns list of ``(low, high)`` primary key bounds splitting
+    ``queryset`` into at most ``partitions`` ranges of similar size.
+
+    ``low`` is inclusive, ``high`` exclusive and ``None`` means unbounded.
+    """
+    pks = queryset.order_by('pk').values_list('pk', flat=True)
+    count = pks.count()
+    size = max(count // max(partitions, 1), 1)
+    bounds = []
+    for offset in range(size, count, size)[:partitions - 1]:
+        bound = pks[offset]
+        if not bounds or bound != bounds[-1]:
+            bounds.append(bound)
+    return list(zip([None] + bounds, bounds + [None]))
+
+
+def can_export_in_processes(tasks):
+    """
+    Returns if ``tasks`` can be sent to worker processes: they can be
+    pickled, ie. the resource class is importable (classes created by
+    ``modelresource_factory`` are not), and no database connection is in an
+    atomic block, whose data workers could not see and whose connection
+    must not be closed.
+    """
+    if any(getattr(connection, 'in_atomic_block', False)
+           for connection in connections.all()):
+        return False
+    try:
+        pickle.dumps(tasks[0], pickle.HIGHEST_PROTOCOL)
+    except (pickle.PicklingError, TypeError, AttributeError):
+        return False
+    return True
+
+
+def export_pk_range(task):
+    """
+    Exports primary key range of a queryset with ``Format.export_chunks``
+    and returns the text.
+
+    ``task`` is a tuple of resource class, its ``export_fields``, format
+    class, model, pickled queryset query, range bounds and
+    ``write_headers``, so it can be sent to a worker process.
+    """
+    (resource_class, export_fields, format_class, model, query, low, high,
+     write_headers) = task
+    queryset = model._default_manager.all()
+    queryset.query = query
+    if low is not None:
+        queryset = queryset.filter(pk__gte=low)
+    if high is not None:
+        queryset = queryset.filter(pk__lt=high)
+    resource = resource_class()
+    resource.export_fields = export_fields
+    rows = resource.iter_export(queryset.order_by('pk'))
+    return ''.join(format_class().export_chunks(
+        resource.get_export_headers(), rows, write_headers))
+
+
+def export_parallel(resource, file_format, queryset=None, stream=None,
+                    processes=None, partitions=None):
+    """
+    Exports ``queryset`` split into primary key ranges, which are exported
+    by a pool of ``processes`` worker processes, each with its own database
+    connection. Exported text of ranges is written in primary key order.
+
+    ``file_format`` must support ``export_chunks`` (ie. CSV, TSV or
+    NDJSON). Rows are ordered by primary key. If text ``stream`` is given
+    exported text is written to it as ranges finish, otherwise it is
+    returned.
+
+    ``partitions`` defaults to four ranges per process. With one process,
+    or when ``can_export_in_processes`` returns ``False``, ranges are
+    exported in the current process.
+    """
+    if not file_format.can_export_chunks():
+        raise ValueError("%s format can not be exported in parallel" %
+                         file_format.get_title())
+    if queryset is None:
+        queryset = resource.get_queryset()
+    if processes is None:
+        processes = multiprocessing.cpu_count()
+    if partitions is None:
+        partitions = processes * 4
+
+    tasks = [(type(resource), resource.export_fields, type(file_format),
+              queryset.model, queryset.query, low, high, i == 0)
+             for i, (low, high) in enumerate(get_pk_ranges(queryset,
+                                                           partitions))]
+    pool = None
+    if processes > 1 and can_export_in_processes(tasks):
+        # forked workers must not share connections of the parent process
+        for connection in connections.all():
+            connection.close()
+        pool = multiprocessing.Pool(processes)
+        texts = pool.imap(export_pk_range, tasks)
+    else:
+        texts = (export_pk_range(task) for task in tasks)
+
+    try:
+        if stream is None:
+            return ''.join(texts)
+        for text in texts:
+            stream.write(text)
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
@@ -0,0 +1,114 @@
+from __future__ import unicode_literals
+
+import time
+from copy import deepcopy
+
+from django.core import signing
+from django.utils.six.moves import cPickle as pickle
+
+
+class PickleSerializer(object):
+    """
+    Serializer for ``django.core.signing`` that can handle model instances.
+
+    Only ever used on signed payloads, so unpickling data that was not
+    produced by this process is not possible without ``SECRET_KEY``.
+    """
+
+    def dumps(self, obj):
+        return pickle.dumps(obj, pickle.HIGHEST_PROTOCOL)
+
+    def loads(self, data):
+        return pickle.loads(data)
+
+
+class PlanStep(object):
+    #: attribute names of model fields changed by an update, ``None`` when
+    #: the whole instance is saved
+    fields = None
+
+    def __init__(self, import_type, instance, m2m_data=None, fields=None):
+        self.import_type = import_type
+        self.instance = instance
+        self.m2m_data = m2m_data or {}
+        self.fields = fields
+
+
+def get_changed_fields(instance, original):
+    """
+    Returns attribute names of concrete fields of ``instance`` whose values
+    differ from ``original``.
+    """
+    return [f.attname for f in instance._meta.fields
+            if getattr(f, 'concrete', True) and
+            getattr(instance, f.attname) != getattr(original, f.attname)]
+
+
+class ImportPlan(object):
+    """
+    Writes decided during a dry run of ``Resource.import_data``.
+
+    Every step holds the row action and a snapshot of the instance with
+    cleaned values already assigned, so the writes can be replayed with
+    ``Resource.replay_plan`` without looking up or cleaning rows again.
+
+    ``version`` is the token returned by
+    ``Resource.get_import_plan_version`` when the plan was created and
+    ``created`` its creation timestamp; both are used by :meth:`is_stale`.
+    """
+    SALT = 'import_export.plans.ImportPlan'
+
+    def __init__(self, version=None):
+        self.version = version
+        self.created = time.time()
+        self.steps = []
+
+    def add(self, import_type, instance, m2m_data=None, original=None):
+        """
+        Records a write of ``instance``.
+
+        ``instance`` is copied, so it can be saved afterwards without
+        changing the recorded step. For updates, ``original`` is the
+        instance as it was loaded and only fields changed since are
+        written on replay.
+        """
+        fields = None
+        if original is not None:
+            fields = get_changed_fields(instance, original)
+        self.steps.append(PlanStep(import_type, deepcopy(instance), m2m_data,
+                                   fields))
+
+    def is_stale(self, version, max_age=None):
+        """
+        Returns ``True`` if data changed since the plan was created or if
+        the plan is older than ``max_age`` seconds.
+        """
+        if version != self.version:
+            return True
+        if max_age is not None and time.time() - self.created > max_age:
+            return True
+        return False
+
+    def dumps(self):
+        """
+        Returns signed string representation of the plan.
+        """
+        return signing.dumps(self, salt=self.SALT,
+                             serializer=PickleSerializer, compress=True)
+
+    @classmethod
+    def loads(cls, data):
+        """
+        Returns plan from string created with :meth:`dumps`.
+
+        Raises ``django.core.signing.BadSignature`` if ``data`` was tampered
+        with.
+        """
+        return signing.loads(data, salt=cls.SALT,
+                             serializer=PickleSerializer)
+
+    def __iter__(self):
+        return iter(self.steps)
+
+    def __len__(self):
+        return len(self.steps)
@@ -1,15 +1,18 @@
 from collections import OrderedDict
 import functools
-from copy import deepcopy
+from copy import copy, deepcopy
+from itertools import islice
 import sys
 import traceback
+from datetime import date, datetime
+from decimal import Decimal
 
 import tablib
 from diff_match_patch import diff_match_patch
 
 from django import VERSION
 from django.utils.safestring import mark_safe
-from django.utils import six
+from django.utils import six, timezone
 from django.db import transaction
 
 try:
@@ -17,18 +20,32 @@ try:
 except ImportError:
     from django.db.models.fields.related import ForeignObjectRel as RelatedObject
 
+from django.db.models import Count, Max, ManyToManyField, OneToOneField
 from django.db.models.fields import FieldDoesNotExist
 from django.db.models.query import QuerySet
 from django.db.transaction import TransactionManagementError
 from django.conf import settings
 
+from . import parallel
+from .formats.base_formats import DatasetChain
 from .results import Error, Result, RowResult
+from .plans import ImportPlan
 from .fields import Field
 from import_export import widgets
 from .instance_loaders import (
     ModelInstanceLoader,
 )
 
+try:
+    from django.db.models import prefetch_related_objects
+except ImportError:
+    # Django < 1.10 takes lookups as a list
+    from django.db.models.query import (
+        prefetch_related_objects as _prefetch_related_objects)
+
+    def prefetch_related_objects(model_instances, *related_lookups):
+        _prefetch_related_objects(model_instances, related_lookups)
+
 try:
     from django.db.transaction import atomic, savepoint, savepoint_rollback, savepoint_commit  # noqa
 except ImportError:
@@ -66,6 +83,51 @@ logging.getLogger(__name__).addHandler(NullHandler())
 USE_TRANSACTIONS = getattr(settings, 'IMPORT_EXPORT_USE_TRANSACTIONS', False)
 
 
+def overrides(obj, cls, name):
+    """
+    Returns ``True`` if method ``name`` of ``cls`` is overridden by class
+    of ``obj``.
+    """
+    return (six.get_unbound_function(getattr(type(obj), name)) is not
+            six.get_unbound_function(getattr(cls, name)))
+
+
+def defining_class(obj, name):
+    """
+    Returns class in MRO of class of ``obj`` defining attribute ``name``.
+    """
+    for cls in type(obj).__mro__:
+        if name in cls.__dict__:
+            return cls
+    return None
+
+
+def get_render_many(widget, typed=False):
+    """
+    Returns callable rendering a list of values with ``widget``, its
+    ``render_many`` (or ``render_typed_many`` if ``typed``), unless
+    ``render`` (or ``render_typed``) is overridden by a subclass of the
+    class defining it, then values are rendered one by one.
+    """
+    name = 'render_typed' if typed else 'render'
+    if issubclass(defining_class(widget, name + '_many'),
+                  defining_class(widget, name)):
+        return getattr(widget, name + '_many')
+    render = getattr(widget, name)
+    return lambda values: [render(value) for value in values]
+
+
+class CleanedRow(OrderedDict):
+    """
+    Import row with values of some columns already cleaned by widgets,
+    which ``Field.clean`` uses instead of cleaning the raw value.
+    """
+
+    def __init__(self, row=(), cleaned=None):
+        super(CleanedRow, self).__init__(row)
+        self.cleaned = cleaned or {}
+
+
 class ResourceOptions(object):
     """
     The inner Meta class allows for class-level configuration of how the
@@ -102,6 +164,19 @@ class ResourceOptions(object):
 
     * ``fields_display`` - is list of pairs (field_name, display_name)
 
+    * ``export_chunk_size`` - Number of objects that are fetched and prepared
+      together during export, ie. when prefetching related objects.
+      Default value is 1000
+
+    * ``import_chunk_size`` - Number of rows whose values are cleaned
+      together, column by column, during import. Default value is 1000
+
+    * ``modified_field`` - Name of model field updated on every change of
+      an object, ie. ``DateTimeField(auto_now=True)``. It is part of the
+      export data version used to cache exports, of the import plan version
+      that detects stale plans, and the watermark of delta exports, which
+      use the primary key when it is not set
+
     """
     fields = None
     model = None
@@ -114,6 +189,9 @@ class ResourceOptions(object):
     fields_display = None
     skip_unchanged = False
     report_skipped = True
+    export_chunk_size = 1000
+    import_chunk_size = 1000
+    modified_field = None
 
 
 class DeclarativeMetaclass(type):
@@ -140,6 +218,8 @@ class DeclarativeMetaclass(type):
                 field = attrs.pop(field_name)
                 if not field.column_name:
                     field.column_name = field_name
+                if field.expression is not None and not field.attribute:
+                    field.attribute = field_name
                 declared_fields.append((field_name, field))
 
         attrs['fields'] = OrderedDict(declared_fields)
@@ -160,7 +240,11 @@ class Resource(six.with_metaclass(DeclarativeMetaclass)):
     """
     Resource defines how objects are mapped to their import and export
     representations and handle importing and exporting data.
+
+    ``export_fields`` is a list of names of fields to export, all fields
+    are exported when it is ``None``.
     """
+    export_fields = None
 
     def get_use_transactions(self):
         if self._meta.use_transactions is None:
@@ -244,6 +328,70 @@ class Resource(six.with_metaclass(DeclarativeMetaclass)):
         """
         pass
 
+    def get_clean_many_fields(self):
+        """
+        Returns import fields whose widgets clean a column of values at
+        once with ``clean_many``.
+
+        Fields are skipped when ``clean_many`` is not overridden by the
+        widget or ``clean`` of the field or widget is overridden without
+        it.
+        """
+        fields = []
+        for field in self.get_fields():
+            if not field.column_name or overrides(field, Field, 'clean'):
+                continue
+            widget = field.widget
+            clean_many_class = defining_class(widget, 'clean_many')
+            if (clean_many_class is not widgets.Widget and
+                    issubclass(clean_many_class,
+                               defining_class(widget, 'clean'))):
+                fields.append(field)
+        return fields
+
+    def clean_rows(self, rows):
+        """
+        Returns list of ``CleanedRow`` for ``rows``, a chunk of import rows,
+        with values of ``get_clean_many_fields`` cleaned column by column.
+
+        Columns with a value that fails to clean are left to ``Field.clean``
+        to report the error on its row, as are columns read by several
+        fields, which may clean them with different widgets.
+        """
+        if not rows:
+            return rows
+        column_names = [field.column_name for field in self.get_fields()]
+        columns = {}
+        for field in self.get_clean_many_fields():
+            column_name = field.column_name
+            if (column_names.count(column_name) > 1 or
+                    column_name not in rows[0]):
+                continue
+            try:
+                columns[column_name] = field.widget.clean_many(
+                    [row[column_name] for row in rows])
+            except Exception:
+                continue
+        if not columns:
+            return rows
+        return [CleanedRow(row, dict((column_name, values[i])
+                                     for column_name, values
+                                     in columns.items()))
+                for i, row in enumerate(rows)]
+
+    def iter_clean_rows(self, dataset):
+        """
+        Yields rows of ``dataset`` cleaned column-wise in chunks of
+        ``import_chunk_size`` rows (``clean_rows``).
+        """
+        rows = iter(dataset.dict)
+        while True:
+            chunk = list(islice(rows, self._meta.import_chunk_size))
+            if not chunk:
+                break
+            for row in self.clean_rows(chunk):
+                yield row
+
     def import_field(self, field, obj, data):
         if field.attribute and field.column_name in data:
             field.save(obj, data)
@@ -331,9 +479,27 @@ class Resource(six.with_metaclass(DeclarativeMetaclass)):
         """
         pass
 
+    def get_import_plan_version(self):
+        """
+        Returns token identifying the state of data an import plan is built
+        against. Plan is not replayed if the token changed in the meantime.
+
+        Default implementation returns ``None``.
+        """
+        return None
+
+    def get_export_version(self, queryset):
+        """
+        Returns token identifying the state of data exported from
+        ``queryset``, used to cache exports.
+
+        Default implementation returns ``None``, which disables caching.
+        """
+        return None
+
     @atomic()
     def import_data(self, dataset, dry_run=False, raise_errors=False,
-                    use_transactions=None, **kwargs):
+                    use_transactions=None, collect_plan=False, **kwargs):
         """
         Imports data from ``dataset``.
 
@@ -341,10 +507,21 @@ class Resource(six.with_metaclass(DeclarativeMetaclass)):
             If ``True`` import process will be processed inside transaction.
             If ``dry_run`` is set, or error occurs, transaction will be rolled
             back.
+
+        ``collect_plan``
+            If ``True`` writes decided for each row are recorded in
+            ``result.plan`` (:class:`import_export.plans.ImportPlan`), which
+            can later be executed with ``replay_plan``.
         """
         result = Result()
         result.diff_headers = self.get_diff_headers()
 
+        plan = None
+        if collect_plan:
+            plan = result.plan = ImportPlan(self.get_import_plan_version())
+            m2m_columns = [f.column_name for f in self.get_fields()
+                           if isinstance(f.widget, widgets.ManyToManyWidget)]
+
         if use_transactions is None:
             use_transactions = self.get_use_transactions()
 
@@ -369,7 +546,7 @@ class Resource(six.with_metaclass(DeclarativeMetaclass)):
 
         instance_loader = self._meta.instance_loader_class(self, dataset)
 
-        for row in dataset.dict:
+        for row in self.iter_clean_rows(dataset):
             try:
                 row_result = RowResult()
                 instance, new = self.get_or_init_instance(instance_loader, row)
@@ -386,6 +563,8 @@ class Resource(six.with_metaclass(DeclarativeMetaclass)):
                                                         real_dry_run)
                     else:
                         row_result.import_type = RowResult.IMPORT_TYPE_DELETE
+                        if plan is not None:
+                            plan.add(row_result.import_type, instance)
                         self.delete_instance(instance, real_dry_run)
                         row_result.diff = self.get_diff(original, None,
                                                         real_dry_run)
@@ -394,6 +573,11 @@ class Resource(six.with_metaclass(DeclarativeMetaclass)):
                     if self.skip_row(instance, original):
                         row_result.import_type = RowResult.IMPORT_TYPE_SKIP
                     else:
+                        if plan is not None:
+                            plan.add(row_result.import_type, instance,
+                                     dict((c, row[c]) for c in m2m_columns
+                                          if c in row),
+                                     None if new else original)
                         self.save_instance(instance, real_dry_run)
                         self.save_m2m(instance, row, real_dry_run)
                         # Add object info to RowResult for LogEntry
@@ -424,45 +608,280 @@ class Resource(six.with_metaclass(DeclarativeMetaclass)):
 
         return result
 
+    def import_datasets(self, datasets, **kwargs):
+        """
+        Imports rows of all ``datasets``, ie. sheets of a workbook, with one
+        ``import_data`` call, so they share a single ``Result`` and
+        transaction.
+        """
+        return self.import_data(DatasetChain(datasets), **kwargs)
+
+    def get_plan_instances(self, plan):
+        """
+        Returns dict mapping ``(model, pk)`` to current objects updated by
+        ``plan``, loaded with one query per model.
+        """
+        pks = OrderedDict()
+        for step in plan:
+            if step.fields is not None:
+                pks.setdefault(type(step.instance), []).append(
+                    step.instance.pk)
+        instances = {}
+        for model, model_pks in pks.items():
+            for pk, instance in model._default_manager.in_bulk(
+                    model_pks).items():
+                instances[(model, pk)] = instance
+        return instances
+
+    @atomic()
+    def replay_plan(self, plan, raise_errors=False, use_transactions=None,
+                    **kwargs):
+        """
+        Executes writes recorded in ``plan`` by a dry run of ``import_data``.
+
+        Rows are not cleaned or compared again, only ``save_instance``,
+        ``save_m2m`` and ``delete_instance`` are called. Updated objects
+        are reloaded (``get_plan_instances``) and only fields changed by the
+        import are assigned, so concurrent changes of other fields are kept.
+        Returned ``Result`` rows have no diff.
+        """
+        result = Result()
+        result.diff_headers = self.get_diff_headers()
+
+        if use_transactions is None:
+            use_transactions = self.get_use_transactions()
+
+        if use_transactions is True:
+            sp1 = savepoint()
+
+        current = self.get_plan_instances(plan)
+        for step in plan:
+            row_result = RowResult()
+            row_result.import_type = step.import_type
+            row_result.new_record = (
+                step.import_type == RowResult.IMPORT_TYPE_NEW)
+            instance = step.instance
+            try:
+                if step.fields is not None:
+                    instance = current.get((type(instance), instance.pk))
+                    if instance is None:
+                        raise step.instance.DoesNotExist(
+                            "%s with pk %s was deleted" %
+                            (type(step.instance).__name__, step.instance.pk))
+                    for name in step.fields:
+                        setattr(instance, name,
+                                getattr(step.instance, name))
+                if step.import_type == RowResult.IMPORT_TYPE_DELETE:
+                    self.delete_instance(instance)
+                else:
+                    self.save_instance(instance)
+                    self.save_m2m(instance, step.m2m_data, False)
+                    row_result.object_repr = force_text(instance)
+                    row_result.object_id = instance.pk
+            except Exception as e:
+                if not isinstance(e, TransactionManagementError):
+                    logging.exception(e)
+                tb_info = traceback.format_exc(2)
+                row_result.errors.append(Error(e, tb_info))
+                if raise_errors:
+                    if use_transactions:
+                        savepoint_rollback(sp1)
+                    six.reraise(*sys.exc_info())
+            result.rows.append(row_result)
+
+        if use_transactions:
+            if result.has_errors():
+                savepoint_rollback(sp1)
+            else:
+                savepoint_commit(sp1)
+
+        return result
+
     def get_export_order(self):
         order = tuple(self._meta.export_order or ())
         return order + tuple(k for k in self.fields.keys() if k not in order)
 
+    def get_export_fields(self):
+        """
+        Returns exported fields, ``export_fields`` in ``export_order``
+        order or all fields.
+        """
+        if self.export_fields is None:
+            return self.get_fields()
+        unknown = set(self.export_fields) - set(self.fields)
+        if unknown:
+            raise ValueError("Unknown export fields: %s" %
+                             ", ".join(sorted(unknown)))
+        return [self.fields[f] for f in self.get_export_order()
+                if f in self.export_fields]
+
     def export_field(self, field, obj):
+        """
+        Returns exported value of ``field`` for ``obj``.
+        """
         field_name = self.get_field_name(field)
         method = getattr(self, 'dehydrate_%s' % field_name, None)
         if method is not None:
             return method(obj)
+        method = getattr(self, 'dehydrate_%s_batch' % field_name, None)
+        if method is not None:
+            return method([obj]).get(obj.pk)
         return field.export(obj)
 
+    def export_field_typed(self, field, obj):
+        """
+        Returns exported value of ``field`` for ``obj`` for formats storing
+        typed values, see ``Field.export_typed``.
+
+        Values of ``dehydrate_<field>`` methods and of overridden
+        ``export_field`` or ``Field.export`` are returned as they are.
+        """
+        field_name = self.get_field_name(field)
+        if (overrides(self, Resource, 'export_field') or
+                overrides(field, Field, 'export') or
+                hasattr(self, 'dehydrate_%s' % field_name) or
+                hasattr(self, 'dehydrate_%s_batch' % field_name)):
+            return self.export_field(field, obj)
+        return field.export_typed(obj)
+
+    def get_export_type(self, field):
+        """
+        Returns python type of values of ``field`` exported with
+        ``export_field_typed``, or ``None`` when it is not known.
+        """
+        field_name = self.get_field_name(field)
+        if (overrides(self, Resource, 'export_field') or
+                overrides(self, Resource, 'export_field_typed') or
+                overrides(field, Field, 'export') or
+                overrides(field, Field, 'export_typed') or
+                hasattr(self, 'dehydrate_%s' % field_name) or
+                hasattr(self, 'dehydrate_%s_batch' % field_name)):
+            return None
+        widget = field.widget
+        if defining_class(widget, 'render_typed') not in (
+                widgets.NumberWidget, widgets.BooleanWidget,
+                widgets.DateWidget, widgets.DateTimeWidget):
+            return None
+        for widget_class, export_type in (
+                (widgets.IntegerWidget, int),
+                (widgets.DecimalWidget, Decimal),
+                (widgets.BooleanWidget, bool),
+                (widgets.DateTimeWidget, datetime),
+                (widgets.DateWidget, date)):
+            if isinstance(widget, widget_class):
+                return export_type
+        return None
+
+    def get_export_types(self):
+        """
+        Returns list of python types of exported columns, see
+        ``get_export_type``, used by typed formats to build their schema.
+        """
+        if any(overrides(self, Resource, name)
+               for name in ('export_resource', 'export_row')):
+            return [None] * len(self.get_export_fields())
+        return [self.get_export_type(field)
+                for field in self.get_export_fields()]
+
     def export_resource(self, obj):
-        return [self.export_field(field, obj) for field in self.get_fields()]
+        return [self.export_field(field, obj)
+                for field in self.get_export_fields()]
+
+    def export_row(self, obj, typed=False, batch_values=None):
+        """
+        Returns exported row of ``obj``, like ``export_resource``.
+
+        If ``typed`` is ``True`` values are exported with
+        ``export_field_typed``. ``batch_values`` is dict returned by
+        ``get_export_batch_values`` for the chunk of objects containing
+        ``obj``. Overridden ``export_resource`` is used as it is.
+        """
+        if overrides(self, Resource, 'export_resource'):
+            return self.export_resource(obj)
+        row = []
+        for field in self.get_export_fields():
+            field_name = self.get_field_name(field)
+            if batch_values and field_name in batch_values:
+                row.append(batch_values[field_name].get(obj.pk))
+            elif typed:
+                row.append(self.export_field_typed(field, obj))
+            else:
+                row.append(self.export_field(field, obj))
+        return row
+
+    def get_export_batch_values(self, objs):
+        """
+        Returns dict mapping field names to values returned for ``objs`` by
+        ``dehydrate_<field>_batch`` methods.
+
+        A ``dehydrate_<field>_batch(objs)`` method receives each chunk of
+        exported objects and returns mapping of object ``pk`` to the field
+        value, so computed columns can be fetched with one query per chunk.
+        """
+        batch_values = {}
+        for field in self.get_export_fields():
+            field_name = self.get_field_name(field)
+            method = getattr(self, 'dehydrate_%s_batch' % field_name, None)
+            if method is not None:
+                batch_values[field_name] = method(objs)
+        return batch_values
 
     def get_export_headers(self):
         fields_display_map = self.get_fields_display()
         headers = [
             force_text(
             fields_display_map.get(field.column_name)
-            or field.column_name) for field in self.get_fields()]
+            or field.column_name) for field in self.get_export_fields()]
         return headers
 
-    def export(self, queryset=None):
+    def iter_export(self, queryset=None, typed=False):
         """
-        Exports a resource.
+        Yields exported rows one by one, without building a dataset.
+
+        If ``typed`` is ``True``, values of widgets supporting it are python
+        values (ie. numbers and dates) instead of their text representation,
+        see ``Widget.render_typed``.
         """
         if queryset is None:
             queryset = self.get_queryset()
-        headers = self.get_export_headers()
-        data = tablib.Dataset(headers=headers)
 
+        for objs in self.iter_export_chunks(queryset):
+            batch_values = self.get_export_batch_values(objs)
+            for obj in objs:
+                yield self.export_row(obj, typed, batch_values)
+
+    def iter_export_chunks(self, queryset):
+        """
+        Yields lists of at most ``export_chunk_size`` objects of
+        ``queryset``.
+        """
         if isinstance(queryset, QuerySet):
             # Iterate without the queryset cache, to avoid wasting memory when
             # exporting large datasets.
             iterable = queryset.iterator()
         else:
-            iterable = queryset
-        for obj in iterable:
-            data.append(self.export_resource(obj))
+            iterable = iter(queryset)
+        while True:
+            objs = list(islice(iterable, self._meta.export_chunk_size))
+            if not objs:
+                break
+            yield objs
+
+    def export(self, queryset=None, fields=None):
+        """
+        Exports a resource.
+
+        ``fields`` is a list of names of exported fields, it overrides
+        ``export_fields``.
+        """
+        if fields is not None:
+            resource = copy(self)
+            resource.export_fields = fields
+            return resource.export(queryset)
+        headers = self.get_export_headers()
+        data = tablib.Dataset(headers=headers)
+        for row in self.iter_export(queryset):
+            data.append(row)
         return data
 
 
@@ -613,6 +1032,398 @@ class ModelResource(six.with_metaclass(ModelDeclarativeMetaclass, Resource)):
     def get_queryset(self):
         return self._meta.model.objects.all()
 
+    def get_annotations(self):
+        """
+        Returns dict mapping attributes of fields declared with
+        ``expression`` to their expressions.
+        """
+        return OrderedDict((field.attribute, field.expression)
+                           for field in self.get_export_fields()
+                           if field.expression is not None)
+
+    def annotate_queryset(self, queryset):
+        """
+        Returns ``queryset`` annotated with ``get_annotations``, skipping
+        annotations already present.
+        """
+        existing = getattr(queryset.query, 'annotations', None)
+        if existing is None:
+            # Django < 1.8
+            existing = queryset.query.aggregates
+        annotations = dict((name, expression) for name, expression
+                           in self.get_annotations().items()
+                           if name not in existing)
+        if not annotations:
+            return queryset
+        return queryset.annotate(**annotations)
+
+    def get_related_lookups(self):
+        """
+        Returns ``select_related`` and ``prefetch_related`` lookups for the
+        relations followed by fields, ie. ``author__name`` or fields of
+        foreign key and many-to-many widgets.
+        """
+        select_related = []
+        prefetch_related = []
+        for field in self.get_export_fields():
+            if not field.attribute:
+                continue
+            model = self._meta.model
+            path = []
+            many = False
+            for attr in field.attribute.split('__'):
+                try:
+                    f = model._meta.get_field(attr)
+                except FieldDoesNotExist:
+                    break
+                if isinstance(f, ForeignObjectRel):
+                    # only reverse one-to-one relations can be followed
+                    if not isinstance(f.field, OneToOneField):
+                        break
+                    if RelatedObject is None:
+                        model = f.related_model
+                    else:
+                        # Django < 1.8
+                        model = f.model
+                elif f.rel is None:
+                    break
+                else:
+                    model = f.rel.to
+                    many = isinstance(f, ManyToManyField)
+                path.append(attr)
+                if many:
+                    break
+            if not path:
+                continue
+            lookups = prefetch_related if many else select_related
+            lookup = '__'.join(path)
+            if lookup not in lookups:
+                lookups.append(lookup)
+        return select_related, prefetch_related
+
+    def get_only_fields(self):
+        """
+        Returns names of model fields loaded for the selected
+        ``export_fields`` with ``QuerySet.only()``, or ``None`` when all
+        fields are loaded.
+
+        All fields are loaded when no fields are selected, or a selected
+        field could read any attribute: it has a ``dehydrate_<field>``
+        method, its attribute is not a model field (ie. a property) or
+        export methods of the resource are overridden.
+        """
+        if self.export_fields is None:
+            return None
+        if any(overrides(self, Resource, name)
+               for name in ('export_resource', 'export_row', 'export_field',
+                            'export_field_typed')):
+            return None
+        opts = self._meta.model._meta
+        only = [opts.pk.name]
+        for field in self.get_export_fields():
+            field_name = self.get_field_name(field)
+            if (getattr(self, 'dehydrate_%s' % field_name, None) is not None or
+                    hasattr(self, 'dehydrate_%s_batch' % field_name)):
+                return None
+            if (overrides(field, Field, 'export') or
+                    overrides(field, Field, 'export_typed') or
+                    overrides(field, Field, 'get_value')):
+                return None
+            if not field.attribute or field.expression is not None:
+                continue
+            attr = field.attribute.split('__')[0]
+            try:
+                f = opts.get_field(attr)
+            except FieldDoesNotExist:
+                return None
+            if isinstance(f, (ForeignObjectRel, ManyToManyField)):
+                # loaded by related lookups
+                continue
+            if not getattr(f, 'concrete', False):
+                return None
+            if f.name not in only:
+                only.append(f.name)
+        return only
+
+    def get_export_type(self, field):
+        """
+        Returns ``(Decimal, max_digits, decimal_places)`` for decimal fields
+        whose attribute is a model ``DecimalField``, so typed formats can
+        store all values with the same precision.
+        """
+        export_type = super(ModelResource, self).get_export_type(field)
+        if (export_type is not Decimal or not field.attribute or
+                field.expression is not None):
+            return export_type
+        model = self._meta.model
+        for attr in field.attribute.split('__'):
+            if model is None:
+                return export_type
+            try:
+                f = model._meta.get_field(attr)
+            except FieldDoesNotExist:
+                return export_type
+            model = f.rel.to if getattr(f, 'rel', None) else None
+        if (f.get_internal_type() == 'DecimalField' and
+                f.max_digits is not None and f.decimal_places is not None):
+            return (Decimal, f.max_digits, f.decimal_places)
+        return export_type
+
+    def get_values_list_columns(self, typed=False):
+        """
+        Returns list of ``(lookup, render_many)`` pairs that export fields
+        from ``values_list(*lookups)`` tuples, or ``None`` when some field
+        needs model instances. ``render_many`` renders a list of column
+        values, which are not ``None``, see ``Widget.render_many``.
+
+        Fields need instances when they have a ``dehydrate_<field>`` or
+        ``dehydrate_<field>_batch`` method, their attribute is not a path of
+        concrete model fields (ie. a property or a method), they use
+        ``ManyToManyWidget``, or export methods of the field, widget or
+        resource are overridden.
+        """
+        if any(overrides(self, Resource, name)
+               for name in ('export_resource', 'export_row', 'export_field',
+                            'export_field_typed')):
+            return None
+        columns = []
+        for field in self.get_export_fields():
+            field_name = self.get_field_name(field)
+            if (getattr(self, 'dehydrate_%s' % field_name, None) is not None or
+                    hasattr(self, 'dehydrate_%s_batch' % field_name)):
+                return None
+            if (overrides(field, Field, 'export') or
+                    overrides(field, Field, 'export_typed') or
+                    overrides(field, Field, 'get_value')):
+                return None
+            if not field.attribute:
+                columns.append((None, None))
+                continue
+            if field.expression is not None:
+                widget = field.widget
+                render_many = get_render_many(widget, typed)
+                columns.append((field.attribute, render_many))
+                continue
+
+            model = self._meta.model
+            attrs = field.attribute.split('__')
+            for i, attr in enumerate(attrs):
+                try:
+                    f = model._meta.get_field(attr)
+                except FieldDoesNotExist:
+                    return None
+                if (isinstance(f, (ForeignObjectRel, ManyToManyField)) or
+                        not getattr(f, 'concrete', False)):
+                    return None
+                if i < len(attrs) - 1:
+                    if f.rel is None:
+                        return None
+                    model = f.rel.to
+
+            widget = field.widget
+            if f.rel is None:
+                render_many = get_render_many(widget, typed)
+                columns.append((field.attribute, render_many))
+            elif (isinstance(widget, widgets.ForeignKeyWidget) and
+                    not overrides(widget, widgets.ForeignKeyWidget, 'render')):
+                # the widget renders value of its field on related object,
+                # which must be a concrete column of it
+                if widget.field != 'pk':
+                    try:
+                        related = f.rel.to._meta.get_field(widget.field)
+                    except FieldDoesNotExist:
+                        return None
+                    if (getattr(related, 'rel', None) is not None or
+                            not getattr(related, 'concrete', False)):
+                        return None
+                columns.append(('%s__%s' % (field.attribute, widget.field),
+                                None))
+            else:
+                return None
+        return columns
+
+    def iter_export(self, queryset=None, typed=False):
+        """
+        Yields exported rows, rendering them straight from ``values_list``
+        tuples, column by column in chunks of ``export_chunk_size`` rows,
+        when ``get_values_list_columns`` allows it. Querysets are annotated
+        with expressions of fields (``annotate_queryset``).
+        """
+        if queryset is None:
+            queryset = self.get_queryset()
+        columns = None
+        if isinstance(queryset, QuerySet):
+            queryset = self.annotate_queryset(queryset)
+            columns = self.get_values_list_columns(typed)
+        if columns is None:
+            for row in super(ModelResource, self).iter_export(queryset,
+                                                              typed):
+                yield row
+            return
+
+        lookups = [lookup for lookup, render_many in columns if lookup]
+        empty = None if typed else ""
+        tuples = queryset.values_list(*lookups).iterator()
+        while True:
+            chunk = list(islice(tuples, self._meta.export_chunk_size))
+            if not chunk:
+                break
+            values = iter(zip(*chunk))
+            rendered = []
+            for lookup, render_many in columns:
+                if not lookup:
+                    rendered.append([empty] * len(chunk))
+                    continue
+                column = next(values)
+                present = [value for value in column if value is not None]
+                if render_many is not None:
+                    present = render_many(present)
+                if len(present) == len(column):
+                    rendered.append(present)
+                    continue
+                present = iter(present)
+                rendered.append([empty if value is None else next(present)
+                                 for value in column])
+            for row in zip(*rendered):
+                yield list(row)
+
+    def iter_export_chunks(self, queryset):
+        """
+        Yields chunks of objects with related objects of fields loaded by
+        ``select_related`` and ``prefetch_related`` per chunk, as querysets
+        iterated with ``iterator()`` do not prefetch. Only columns of
+        ``get_only_fields`` are loaded.
+        """
+        select_related, prefetch_related = self.get_related_lookups()
+        if isinstance(queryset, QuerySet):
+            only = self.get_only_fields()
+            if only is not None:
+                # joins of the queryset, ie. admin list_select_related, are
+                # not needed by selected fields and can not be deferred
+                queryset = queryset.all()
+                queryset.query.select_related = False
+            if select_related:
+                queryset = queryset.select_related(*select_related)
+            if only is not None:
+                queryset = queryset.only(*only)
+        chunks = super(ModelResource, self).iter_export_chunks(queryset)
+        for objs in chunks:
+            if prefetch_related:
+                prefetch_related_objects(objs, *prefetch_related)
+            yield objs
+
+    def export_parallel(self, file_format, queryset=None, stream=None,
+                        processes=None, partitions=None):
+        """
+        Exports ``queryset`` split into primary key ranges in a pool of
+        worker processes, see :func:`import_export.parallel.export_parallel`.
+        """
+        return parallel.export_parallel(self, file_format, queryset, stream,
+                                        processes, partitions)
+
+    def get_import_plan_version(self):
+        """
+        Returns number of rows, highest primary key and, with
+        ``modified_field`` option, latest modification of the model.
+
+        Without ``modified_field`` updates are not detected, replayed plans
+        still only write fields changed by the import.
+        """
+        aggregates = {'count': Count('pk'), 'max_pk': Max('pk')}
+        if self._meta.modified_field:
+            aggregates['modified'] = Max(self._meta.modified_field)
+        values = self._meta.model.objects.aggregate(**aggregates)
+        return (values['count'], values['max_pk'], values.get('modified'))
+
+    def get_export_version(self, queryset):
+        """
+        Returns number of rows, highest primary key and, with
+        ``modified_field`` option, latest modification of ``queryset``.
+        """
+        aggregates = {'count': Count('pk'), 'max_pk': Max('pk')}
+        if self._meta.modified_field:
+            aggregates['modified'] = Max(self._meta.modified_field)
+        values = queryset.order_by().aggregate(**aggregates)
+        return (values['count'], values['max_pk'], values.get('modified'))
+
+    def get_watermark_field(self):
+        """
+        Returns name of model field compared with watermarks of delta
+        exports, ``modified_field`` option or ``pk``.
+        """
+        return self._meta.modified_field or 'pk'
+
+    def parse_watermark(self, value):
+        """
+        Returns watermark converted from text ``value``, ie. given in a
+        request or on the command line. Raises ``ValidationError`` for
+        invalid values.
+        """
+        name = self.get_watermark_field()
+        opts = self._meta.model._meta
+        field = opts.pk if name == 'pk' else opts.get_field(name)
+        value = field.to_python(value)
+        if (isinstance(value, datetime) and settings.USE_TZ and
+                timezone.is_naive(value)):
+            value = timezone.make_aware(value,
+                                        timezone.get_default_timezone())
+        return value
+
+    def format_watermark(self, value):
+        """
+        Returns text representation of watermark ``value`` accepted by
+        ``parse_watermark``.
+        """
+        if value is None:
+            return ''
+        if hasattr(value, 'isoformat'):
+            return value.isoformat()
+        return force_text(value)
+
+    def get_delta_queryset(self, queryset, since=None):
+        """
+        Returns tuple of ``queryset`` filtered to rows changed after
+        watermark ``since`` and the new watermark, the highest value of
+        ``get_watermark_field`` at the time of the export. Rows changed
+        later are left to the next delta export.
+        """
+        field = self.get_watermark_field()
+        watermark = queryset.order_by().aggregate(
+            watermark=Max(field))['watermark']
+        if watermark is None or (since is not None and watermark <= since):
+            return queryset.none(), since
+        queryset = queryset.filter(**{'%s__lte' % field: watermark})
+        if since is not None:
+            queryset = queryset.filter(**{'%s__gt' % field: since})
+        return queryset, watermark
+
+    def get_deleted_keys(self, since, watermark):
+        """
+        Returns keys of objects deleted after watermark ``since``, up to
+        ``watermark``, ie. read from a tombstone table maintained by
+        ``post_delete`` signal.
+
+        Default implementation returns an empty list.
+        """
+        return []
+
+    def export_delta(self, since=None, queryset=None):
+        """
+        Exports rows changed after watermark ``since``, all rows when it is
+        ``None``.
+
+        Returns tuple of dataset, new watermark to pass as ``since`` to
+        the next delta export and keys of deleted objects
+        (``get_deleted_keys``).
+        """
+        if queryset is None:
+            queryset = self.get_queryset()
+        queryset, watermark = self.get_delta_queryset(queryset, since)
+        deleted = []
+        if since is not None:
+            deleted = self.get_deleted_keys(since, watermark)
+        return self.export(queryset), watermark, deleted
+
     def init_instance(self, row=None):
         return self._meta.model()
 
@@ -1,12 +1,21 @@
 # -*- coding: utf-8 -*-
+import io
 import os
 import tempfile
+import time
+import zlib
+
+from datetime import datetime, timedelta
+
+from io import BytesIO
 
 from uuid import uuid4
 
 from django.core.cache import cache
 from django.core.files.storage import default_storage
-from django.core.files.base import ContentFile
+from django.core.files.base import ContentFile, File
+from django.utils import timezone
+from django.utils.encoding import force_bytes
 
 
 class BaseStorage(object):
@@ -17,20 +26,53 @@ class BaseStorage(object):
     def save(self, data, mode='w'):
         raise NotImplementedError
 
+    def save_chunks(self, chunks, mode='wb'):
+        """
+        Saves data from iterable of byte strings, ie.
+        ``UploadedFile.chunks()``.
+
+        Default implementation joins chunks and calls ``save``, subclasses
+        should write chunks as they come.
+        """
+        self.save(b''.join(chunks), mode)
+
     def read(self, read_mode='r'):
         raise NotImplementedError
 
+    def open_stream(self):
+        """
+        Returns binary file-like object for reading saved data.
+
+        Default implementation wraps data returned by ``read`` in
+        ``BytesIO``, subclasses should avoid loading the whole data.
+        """
+        return BytesIO(self.read('rb'))
+
     def remove(self):
         raise NotImplementedError
 
+    @classmethod
+    def sweep(cls, max_age, limit=None):
+        """
+        Removes entries saved more than ``max_age`` seconds ago, ie. files of
+        imports that were never confirmed.
+
+        At most ``limit`` entries are removed if it is given.
+        Returns number of removed entries.
+        """
+        raise NotImplementedError
+
 
 class TempFolderStorage(BaseStorage):
+    #: prefix of temporary file names, used to find files to ``sweep``
+    PREFIX = 'django-import-export-'
 
     def open(self, mode='r'):
         if self.name:
             return open(self.get_full_path(), mode)
         else:
-            tmp_file = tempfile.NamedTemporaryFile(delete=False)
+            tmp_file = tempfile.NamedTemporaryFile(delete=False,
+                                                   prefix=self.PREFIX)
             self.name = tmp_file.name
             return tmp_file
 
@@ -38,13 +80,41 @@ class TempFolderStorage(BaseStorage):
         with self.open(mode=mode) as file:
             file.write(data)
 
+    def save_chunks(self, chunks, mode='wb'):
+        with self.open(mode=mode) as file:
+            for chunk in chunks:
+                file.write(chunk)
+
     def read(self, mode='r'):
         with self.open(mode=mode) as file:
             return file.read()
 
+    def open_stream(self):
+        return open(self.get_full_path(), 'rb')
+
     def remove(self):
         os.remove(self.get_full_path())
 
+    @classmethod
+    def sweep(cls, max_age, limit=None):
+        directory = tempfile.gettempdir()
+        expires = time.time() - max_age
+        removed = 0
+        for name in os.listdir(directory):
+            if limit is not None and removed >= limit:
+                break
+            if not name.startswith(cls.PREFIX):
+                continue
+            path = os.path.join(directory, name)
+            try:
+                if os.path.getmtime(path) < expires:
+                    os.remove(path)
+                    removed += 1
+            except OSError:
+                # removed in the meantime
+                continue
+        return removed
+
     def get_full_path(self):
         return os.path.join(
             tempfile.gettempdir(),
@@ -62,32 +132,255 @@ class CacheStorage(BaseStorage):
     def save(self, data, mode=None):
         if not self.name:
             self.name = uuid4().hex
-        cache.set(self.CACHE_PREFIX + self.name, data, self.CACHE_LIFETIME)
+        cache.set(self.get_cache_key(), data, self.CACHE_LIFETIME)
 
     def read(self, read_mode='r'):
-        return cache.get(self.CACHE_PREFIX + self.name)
+        return cache.get(self.get_cache_key())
 
     def remove(self):
-        cache.delete(self.name)
+        cache.delete(self.get_cache_key())
+
+    @classmethod
+    def sweep(cls, max_age, limit=None):
+        """
+        Entries expire from cache after ``CACHE_LIFETIME`` seconds, so there
+        is nothing to remove.
+        """
+        return 0
+
+    def get_cache_key(self):
+        return self.CACHE_PREFIX + self.name
+
+
+class ChunkReader(io.RawIOBase):
+    """
+    Read-only raw stream over an iterable of byte strings.
+    """
+
+    def __init__(self, chunks):
+        self.chunks = iter(chunks)
+        self.chunk = b''
+        self.offset = 0
+
+    def readable(self):
+        return True
+
+    def close(self):
+        if hasattr(self.chunks, 'close'):
+            self.chunks.close()
+        super(ChunkReader, self).close()
+
+    def readinto(self, b):
+        while self.offset >= len(self.chunk):
+            self.chunk = next(self.chunks, None)
+            self.offset = 0
+            if self.chunk is None:
+                self.chunk = b''
+                return 0
+        size = min(len(b), len(self.chunk) - self.offset)
+        b[:size] = self.chunk[self.offset:self.offset + size]
+        self.offset += size
+        return size
+
+
+class ChunkedCacheStorage(CacheStorage):
+    """
+    Splits data into zlib compressed chunks stored under separate cache keys,
+    so files larger than the cache backend maximum value size can be stored.
+
+    Number of chunks is stored in a manifest under the ``CacheStorage`` key.
+    """
+    #: size in bytes of uncompressed data stored in one cache key
+    CHUNK_SIZE = 512 * 1024
+    COMPRESS_LEVEL = 6
+
+    def save(self, data, mode=None):
+        self.save_chunks([force_bytes(data)], mode)
+
+    def save_chunks(self, chunks, mode=None):
+        if not self.name:
+            self.name = uuid4().hex
+        count = 0
+        buffer = bytearray()
+        for chunk in chunks:
+            buffer.extend(chunk)
+            while len(buffer) >= self.CHUNK_SIZE:
+                self.save_chunk(count, bytes(buffer[:self.CHUNK_SIZE]))
+                del buffer[:self.CHUNK_SIZE]
+                count += 1
+        if buffer:
+            self.save_chunk(count, bytes(buffer))
+            count += 1
+        cache.set(self.get_cache_key(), {'chunks': count},
+                  self.CACHE_LIFETIME)
+
+    def save_chunk(self, index, data):
+        cache.set(self.get_chunk_key(index),
+                  zlib.compress(data, self.COMPRESS_LEVEL),
+                  self.CACHE_LIFETIME)
+
+    def iter_chunks(self):
+        """
+        Yields decompressed chunks, fetching them from cache one by one.
+        """
+        manifest = cache.get(self.get_cache_key())
+        if manifest is None:
+            return
+        for index in range(manifest['chunks']):
+            data = cache.get(self.get_chunk_key(index))
+            if data is None:
+                raise IOError("Chunk %s of %s expired from cache" % (
+                    index, self.name))
+            yield zlib.decompress(data)
+
+    def read(self, read_mode='r'):
+        if cache.get(self.get_cache_key()) is None:
+            return None
+        return b''.join(self.iter_chunks())
+
+    def open_stream(self):
+        return io.BufferedReader(ChunkReader(self.iter_chunks()))
+
+    def remove(self):
+        manifest = cache.get(self.get_cache_key())
+        keys = [self.get_cache_key()]
+        if manifest is not None:
+            keys.extend(self.get_chunk_key(index)
+                        for index in range(manifest['chunks']))
+        cache.delete_many(keys)
+
+    def get_chunk_key(self, index):
+        return '%s-%s' % (self.get_cache_key(), index)
 
 
 class MediaStorage(BaseStorage):
     MEDIA_FOLDER = 'django-import-export'
+    #: size in bytes above which ``save_chunks`` spools data to disk
+    SPOOL_MAX_SIZE = 1024 * 1024
 
     def save(self, data, mode=None):
         if not self.name:
             self.name = uuid4().hex
         default_storage.save(self.get_full_path(), ContentFile(data))
 
+    def save_chunks(self, chunks, mode=None):
+        if not self.name:
+            self.name = uuid4().hex
+        with tempfile.SpooledTemporaryFile(self.SPOOL_MAX_SIZE) as spool:
+            for chunk in chunks:
+                spool.write(chunk)
+            spool.seek(0)
+            default_storage.save(self.get_full_path(), File(spool))
+
     def read(self, read_mode='r'):
         with default_storage.open(self.get_full_path()) as file:
             return file.read()
 
+    def open_stream(self):
+        return default_storage.open(self.get_full_path(), 'rb')
+
     def remove(self):
         default_storage.delete(self.get_full_path())
 
+    @classmethod
+    def sweep(cls, max_age, limit=None):
+        try:
+            names = default_storage.listdir(cls.MEDIA_FOLDER)[1]
+        except OSError:
+            # folder does not exist yet
+            return 0
+        # ``modified_time`` is renamed to ``get_modified_time`` in Django 1.10
+        get_modified_time = (getattr(default_storage, 'get_modified_time',
+                                     None) or default_storage.modified_time)
+        removed = 0
+        for name in names:
+            if limit is not None and removed >= limit:
+                break
+            path = os.path.join(cls.MEDIA_FOLDER, name)
+            modified = get_modified_time(path)
+            now = timezone.now() if timezone.is_aware(modified) \
+                else datetime.now()
+            if modified < now - timedelta(seconds=max_age):
+                default_storage.delete(path)
+                removed += 1
+        return removed
+
     def get_full_path(self):
         return os.path.join(
             self.MEDIA_FOLDER,
             self.name
         )
+
+
+class CompressedStorage(BaseStorage):
+    """
+    Gzip compresses data saved to ``storage_class`` storage and decompresses
+    it while it is read from ``open_stream``.
+
+    Subclass and set ``storage_class`` to compress other storages.
+    """
+    storage_class = TempFolderStorage
+    COMPRESS_LEVEL = 6
+    #: size in bytes of compressed chunks read from underlying storage
+    READ_CHUNK_SIZE = 64 * 1024
+    #: gzip container, so saved files can be inspected with ``gunzip``
+    WBITS = 16 + zlib.MAX_WBITS
+
+    def __init__(self, name=None):
+        self.storage = self.storage_class(name=name)
+
+    @property
+    def name(self):
+        return self.storage.name
+
+    def save(self, data, mode=None):
+        self.save_chunks([force_bytes(data)])
+
+    def save_chunks(self, chunks, mode=None):
+        self.storage.save_chunks(self.compress(chunks))
+
+    def compress(self, chunks):
+        compressor = zlib.compressobj(self.COMPRESS_LEVEL, zlib.DEFLATED,
+                                      self.WBITS)
+        for chunk in chunks:
+            data = compressor.compress(chunk)
+            if data:
+                yield data
+        yield compressor.flush()
+
+    def decompress(self, stream):
+        decompressor = zlib.decompressobj(self.WBITS)
+        try:
+            while True:
+                chunk = stream.read(self.READ_CHUNK_SIZE)
+                if not chunk:
+                    break
+                data = decompressor.decompress(chunk)
+                if data:
+                    yield data
+            yield decompressor.flush()
+        finally:
+            stream.close()
+
+    def read(self, read_mode='r'):
+        with self.open_stream() as stream:
+            return stream.read()
+
+    def open_stream(self):
+        return io.BufferedReader(
+            ChunkReader(self.decompress(self.storage.open_stream())))
+
+    def remove(self):
+        self.storage.remove()
+
+    @classmethod
+    def sweep(cls, max_age, limit=None):
+        return cls.storage_class.sweep(max_age, limit)
+
+
+class CompressedTempFolderStorage(CompressedStorage):
+    storage_class = TempFolderStorage
+
+
+class CompressedMediaStorage(CompressedStorage):
+    storage_class = MediaStorage
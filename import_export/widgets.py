@@ -1,8 +1,8 @@
 from __future__ import unicode_literals
 
 from decimal import Decimal
-from datetime import datetime
-from django.utils import datetime_safe, timezone
+from datetime import date, datetime
+from django.utils import datetime_safe, six, timezone
 from django.utils.encoding import smart_text
 from django.conf import settings
 
@@ -12,6 +12,24 @@ except ImportError:
     from django.utils.encoding import force_unicode as force_text
 
 
+def strptime(value, formats):
+    """
+    Returns datetime parsed from ``value`` with the first matching of
+    ``formats`` or ``None``. The matching format is moved to the front of
+    ``formats`` list, so consecutive values in the same format are parsed
+    with one attempt.
+    """
+    for i, format in enumerate(formats):
+        try:
+            dt = datetime.strptime(value, format)
+        except (ValueError, TypeError):
+            continue
+        if i:
+            formats.insert(0, formats.pop(i))
+        return dt
+    return None
+
+
 class Widget(object):
     """
     Widget takes care of converting between import and export representations.
@@ -35,6 +53,39 @@ class Widget(object):
         """
         return force_text(value)
 
+    def render_typed(self, value):
+        """
+        Returns export representation of python value for formats storing
+        typed values. Default implementation returns ``render(value)``.
+        """
+        return self.render(value)
+
+    def clean_many(self, values):
+        """
+        Returns list of python objects for import values of a column.
+
+        Default implementation calls ``clean`` for every value, built-in
+        widgets override it to avoid the per value overhead.
+        """
+        clean = self.clean
+        return [clean(value) for value in values]
+
+    def render_many(self, values):
+        """
+        Returns list of export representations of python values of
+        a column, which are not ``None``.
+        """
+        render = self.render
+        return [render(value) for value in values]
+
+    def render_typed_many(self, values):
+        """
+        Returns list of typed export representations of python values of
+        a column, which are not ``None``.
+        """
+        render_typed = self.render_typed
+        return [render_typed(value) for value in values]
+
 
 class NumberWidget(Widget):
 
@@ -45,6 +96,15 @@ class NumberWidget(Widget):
     def render(self, value):
         return value
 
+    def render_typed(self, value):
+        return value
+
+    def render_many(self, values):
+        return list(values)
+
+    def render_typed_many(self, values):
+        return list(values)
+
 
 class IntegerWidget(NumberWidget):
     """
@@ -56,6 +116,11 @@ class IntegerWidget(NumberWidget):
             return None
         return int(float(value))
 
+    def clean_many(self, values):
+        is_empty = self.is_empty
+        return [None if is_empty(value) else int(float(value))
+                for value in values]
+
 
 class DecimalWidget(NumberWidget):
     """
@@ -67,6 +132,11 @@ class DecimalWidget(NumberWidget):
             return None
         return Decimal(value)
 
+    def clean_many(self, values):
+        is_empty = self.is_empty
+        return [None if is_empty(value) else Decimal(value)
+                for value in values]
+
 
 class CharWidget(Widget):
     """
@@ -76,6 +146,11 @@ class CharWidget(Widget):
     def render(self, value):
         return force_text(value)
 
+    def render_many(self, values):
+        text_type = six.text_type
+        return [value if type(value) is text_type else force_text(value)
+                for value in values]
+
 
 class BooleanWidget(Widget):
     """
@@ -89,11 +164,27 @@ class BooleanWidget(Widget):
             return ""
         return self.TRUE_VALUES[0] if value else self.FALSE_VALUE
 
+    def render_typed(self, value):
+        return value
+
     def clean(self, value):
         if value == "":
             return None
         return True if value in self.TRUE_VALUES else False
 
+    def clean_many(self, values):
+        true_values = self.TRUE_VALUES
+        return [None if value == "" else value in true_values
+                for value in values]
+
+    def render_many(self, values):
+        true_value = self.TRUE_VALUES[0]
+        false_value = self.FALSE_VALUE
+        return [true_value if value else false_value for value in values]
+
+    def render_typed_many(self, values):
+        return list(values)
+
 
 class DateWidget(Widget):
     """
@@ -115,6 +206,10 @@ class DateWidget(Widget):
     def clean(self, value):
         if not value:
             return None
+        if isinstance(value, datetime):
+            return value.date()
+        if isinstance(value, date):
+            return value
         for format in self.formats:
             try:
                 return datetime.strptime(value, format).date()
@@ -122,6 +217,30 @@ class DateWidget(Widget):
                 continue
         raise ValueError("Enter a valid date.")
 
+    def clean_many(self, values):
+        """
+        Cleans values of a column, parsing every distinct value once and
+        trying the format that matched the previous value first.
+        """
+        formats = list(self.formats)
+        parsed = {}
+        cleaned = []
+        for value in values:
+            if not value:
+                cleaned.append(None)
+            elif isinstance(value, datetime):
+                cleaned.append(value.date())
+            elif isinstance(value, date):
+                cleaned.append(value)
+            else:
+                if value not in parsed:
+                    dt = strptime(value, formats)
+                    if dt is None:
+                        raise ValueError("Enter a valid date.")
+                    parsed[value] = dt.date()
+                cleaned.append(parsed[value])
+        return cleaned
+
     def render(self, value):
         if not value:
             return ""
@@ -130,6 +249,25 @@ class DateWidget(Widget):
         except:
             return datetime_safe.new_date(value).strftime(self.formats[0])
 
+    def render_typed(self, value):
+        return value
+
+    def render_many(self, values):
+        format = self.formats[0]
+        rendered = []
+        for value in values:
+            if not value:
+                rendered.append("")
+                continue
+            try:
+                rendered.append(value.strftime(format))
+            except:
+                rendered.append(datetime_safe.new_date(value).strftime(format))
+        return rendered
+
+    def render_typed_many(self, values):
+        return list(values)
+
 
 class DateTimeWidget(Widget):
     """
@@ -151,6 +289,11 @@ class DateTimeWidget(Widget):
     def clean(self, value):
         if not value:
             return None
+        if isinstance(value, datetime):
+            if settings.USE_TZ and timezone.is_naive(value):
+                return timezone.make_aware(value,
+                                           timezone.get_default_timezone())
+            return value
         for format in self.formats:
             try:
                 dt = datetime.strptime(value, format)
@@ -164,11 +307,49 @@ class DateTimeWidget(Widget):
                 continue
         raise ValueError("Enter a valid date/time.")
 
+    def clean_many(self, values):
+        """
+        Cleans values of a column, parsing every distinct value once, trying
+        the format that matched the previous value first and looking up the
+        default time zone once.
+        """
+        formats = list(self.formats)
+        tz = timezone.get_default_timezone() if settings.USE_TZ else None
+        parsed = {}
+        cleaned = []
+        for value in values:
+            if not value:
+                cleaned.append(None)
+            elif isinstance(value, datetime):
+                if tz is not None and timezone.is_naive(value):
+                    value = timezone.make_aware(value, tz)
+                cleaned.append(value)
+            else:
+                if value not in parsed:
+                    dt = strptime(value, formats)
+                    if dt is None:
+                        raise ValueError("Enter a valid date/time.")
+                    if tz is not None:
+                        dt = timezone.make_aware(dt, tz)
+                    parsed[value] = dt
+                cleaned.append(parsed[value])
+        return cleaned
+
     def render(self, value):
         if not value:
             return ""
         return value.strftime(self.formats[0])
 
+    def render_typed(self, value):
+        return value
+
+    def render_many(self, values):
+        format = self.formats[0]
+        return [value.strftime(format) if value else "" for value in values]
+
+    def render_typed_many(self, values):
+        return list(values)
+
 
 class ForeignKeyWidget(Widget):
     """
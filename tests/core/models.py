@@ -14,6 +14,10 @@ class Author(models.Model):
     def __str__(self):
         return self.name
 
+    @property
+    def upper_name(self):
+        return self.name.upper()
+
 
 @python_2_unicode_compatible
 class Category(models.Model):
@@ -1,15 +1,30 @@
 from __future__ import unicode_literals
 
 import os.path
+import time
 
+import tablib
+
+from django.contrib import admin
+from django.core.files.uploadedfile import SimpleUploadedFile
 from django.test.utils import override_settings
 from django.test.testcases import TestCase
 from django.contrib.auth.models import User
+from django.utils import six
 from django.utils.translation import ugettext_lazy as _
 from django.contrib.admin.models import LogEntry
 
-from core.admin import BookAdmin
-from core.models import Category
+from import_export import admin as admin_module
+from import_export import fields, resources
+from import_export.formats import base_formats
+from import_export.forms import ImportForm
+from import_export.tmp_storages import (
+    CompressedTempFolderStorage,
+    TempFolderStorage,
+)
+
+from core.admin import BookAdmin, BookImportResource
+from core.models import Book, Category
 
 
 class ImportExportAdminIntegrationTest(TestCase):
@@ -64,6 +79,151 @@ class ImportExportAdminIntegrationTest(TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertContains(response, _('Import finished'))
 
+    def test_import_with_plan(self):
+        BookAdmin.use_import_plan = True
+        try:
+            filename = os.path.join(
+                os.path.dirname(__file__),
+                os.path.pardir,
+                'exports',
+                'books.csv')
+            with open(filename, "rb") as f:
+                data = {
+                    'input_format': '0',
+                    'import_file': f,
+                }
+                response = self.client.post('/admin/core/book/import/', data)
+            data = response.context['confirm_form'].initial
+            self.assertTrue(data['import_plan_name'])
+            response = self.client.post('/admin/core/book/process_import/',
+                                        data, follow=True)
+        finally:
+            BookAdmin.use_import_plan = False
+        self.assertContains(response, _('Import finished'))
+        self.assertEqual(Book.objects.get(pk=1).name, 'Some book')
+
+    def test_import_compressed_tmp_storage(self):
+        BookAdmin.tmp_storage_class = CompressedTempFolderStorage
+        try:
+            filename = os.path.join(
+                os.path.dirname(__file__),
+                os.path.pardir,
+                'exports',
+                'books.csv')
+            with open(filename, "rb") as f:
+                data = {
+                    'input_format': '0',
+                    'import_file': f,
+                }
+                response = self.client.post('/admin/core/book/import/', data)
+            self.assertFalse(response.context['result'].has_errors())
+            data = response.context['confirm_form'].initial
+            response = self.client.post('/admin/core/book/process_import/',
+                                        data, follow=True)
+        finally:
+            BookAdmin.tmp_storage_class = None
+        self.assertContains(response, _('Import finished'))
+
+    def test_import_all_sheets(self):
+        BookAdmin.import_all_sheets = True
+        try:
+            formats = BookAdmin(Book, admin.site).get_import_formats()
+            filename = os.path.join(
+                os.path.dirname(__file__),
+                os.path.pardir,
+                'exports',
+                'books-sheets.xlsx')
+            with open(filename, "rb") as f:
+                data = {
+                    'input_format': str(formats.index(base_formats.XLSX)),
+                    'import_file': f,
+                }
+                response = self.client.post('/admin/core/book/import/', data)
+            self.assertEqual(len(response.context['result'].rows), 3)
+            data = response.context['confirm_form'].initial
+            response = self.client.post('/admin/core/book/process_import/',
+                                        data, follow=True)
+        finally:
+            BookAdmin.import_all_sheets = False
+        self.assertContains(response, _('Import finished'))
+        self.assertEqual(Book.objects.get(pk=3).author_email,
+                         'test@example.com')
+
+    def test_import_sweeps_tmp_storage(self):
+        tmp_storage = TempFolderStorage()
+        tmp_storage.save(b'abandoned')
+        a_day_ago = time.time() - 2 * 86400
+        os.utime(tmp_storage.get_full_path(), (a_day_ago, a_day_ago))
+
+        admin_module.TMP_STORAGE_SWEEP_INTERVAL = 60
+        try:
+            admin_module._last_sweeps.clear()
+            BookAdmin(Book, admin.site).sweep_tmp_storage()
+        finally:
+            admin_module.TMP_STORAGE_SWEEP_INTERVAL = None
+        self.assertFalse(os.path.isfile(tmp_storage.get_full_path()))
+
+    def test_import_dataset_for_before_import(self):
+        class B(BookImportResource):
+            def before_import(self, dataset, dry_run, **kwargs):
+                dataset.append_col(['x'] * len(dataset), header='note')
+
+        tmp_storage = TempFolderStorage()
+        tmp_storage.save(b'id,name\n1,Some book\n', 'wb')
+        book_admin = BookAdmin(Book, admin.site)
+        dataset = book_admin.get_import_dataset(
+            base_formats.CSV(), tmp_storage, BookImportResource())
+        self.assertIsInstance(dataset, base_formats.RowStream)
+
+        dataset = book_admin.get_import_dataset(
+            base_formats.CSV(), tmp_storage, B())
+        self.assertIsInstance(dataset, tablib.Dataset)
+        result = B().import_data(dataset, dry_run=True)
+        self.assertFalse(result.has_errors())
+        tmp_storage.remove()
+
+    def test_import_form_keeps_extension_format(self):
+        import_file = SimpleUploadedFile(
+            'books.yaml', b'- {id: 1, name: Some book}\n')
+        import_formats = [base_formats.CSV, base_formats.YAML]
+        form = ImportForm(import_formats, {'input_format': ''},
+                          {'import_file': import_file})
+        self.assertTrue(form.is_valid())
+        self.assertEqual(form.cleaned_data['input_format'], '1')
+
+    def test_import_form_sniffs_json_formats(self):
+        import_formats = admin_module.DEFAULT_FORMATS
+        ndjson = b'{"id": 1, "name": "a"}\n{"id": 2, "name": "b"}\n'
+        for name, content, format in (
+                ('feed.jsonl', ndjson, base_formats.NDJSON),
+                ('books.txt', b'[{"id": 1, "name": "Some book"}]',
+                 base_formats.JSON),
+                ('one.jsonl', b'{"id": 1, "name": "Some book"}\n',
+                 base_formats.NDJSON),
+                ('one.json', b'{"id": 1, "name": "Some book"}\n',
+                 base_formats.JSON)):
+            form = ImportForm(import_formats, {'input_format': ''},
+                              {'import_file': SimpleUploadedFile(name,
+                                                                 content)})
+            self.assertTrue(form.is_valid())
+            self.assertEqual(form.cleaned_data['input_format'],
+                             str(import_formats.index(format)), name)
+
+    def test_import_form_sniffs_format(self):
+        # xlsx content uploaded with misleading extension
+        filename = os.path.join(
+            os.path.dirname(__file__),
+            os.path.pardir,
+            'exports',
+            'books.xlsx')
+        with open(filename, "rb") as f:
+            import_file = SimpleUploadedFile('books.csv', f.read())
+        import_formats = [base_formats.CSV, base_formats.XLSX]
+        form = ImportForm(import_formats, {'input_format': ''},
+                          {'import_file': import_file})
+        self.assertTrue(form.is_valid())
+        self.assertEqual(form.cleaned_data['input_format'], '1')
+
     def test_export(self):
         response = self.client.get('/admin/core/book/export/')
         self.assertEqual(response.status_code, 200)
@@ -76,6 +236,187 @@ class ImportExportAdminIntegrationTest(TestCase):
         self.assertTrue(response.has_header("Content-Disposition"))
         self.assertEqual(response['Content-Type'], 'text/csv')
 
+    def test_export_csv_streaming(self):
+        Book.objects.create(id=1, name='Some book')
+        data = {
+            'file_format': '0',
+            }
+        response = self.client.post('/admin/core/book/export/', data)
+        self.assertTrue(response.streaming)
+        content = b''.join(response.streaming_content).decode('utf-8')
+        self.assertEqual(content.splitlines()[1][:11], '1,Some book')
+
+    def test_export_data_not_streamed(self):
+        Book.objects.create(id=1, name='Some book')
+        book_admin = BookAdmin(Book, admin.site)
+        export_data = book_admin.get_export_data(base_formats.CSV(),
+                                                 Book.objects.all())
+        self.assertIsInstance(export_data, six.string_types)
+        self.assertIn('Some book', export_data)
+
+        class B(BookImportResource):
+            def export(self, queryset=None, fields=None):
+                dataset = super(B, self).export(queryset, fields)
+                dataset.append_col(['x'] * len(dataset), header='note')
+                return dataset
+
+        BookAdmin.resource_class = B
+        try:
+            response = self.client.post('/admin/core/book/export/',
+                                        {'file_format': '0'})
+        finally:
+            BookAdmin.resource_class = None
+        self.assertFalse(response.streaming)
+        self.assertIn(b'note', response.content.splitlines()[0])
+
+    def test_export_data_two_argument_override(self):
+        Book.objects.create(id=1, name='Some book')
+
+        def get_export_data(self, file_format, queryset):
+            return 'custom export'
+
+        BookAdmin.get_export_data = get_export_data
+        try:
+            response = self.client.post('/admin/core/book/export/',
+                                        {'file_format': '0'})
+        finally:
+            del BookAdmin.get_export_data
+        self.assertEqual(response.content, b'custom export')
+
+    def test_export_delta(self):
+        Book.objects.create(id=1, name='Some book')
+        Book.objects.create(id=2, name='Other book')
+        data = {'file_format': '0', 'since': '1'}
+        response = self.client.post('/admin/core/book/export/', data)
+        self.assertEqual(response['X-Export-Watermark'], '2')
+        content = b''.join(response.streaming_content)
+        self.assertIn(b'Other book', content)
+        self.assertNotIn(b'Some book', content)
+
+        data['since'] = 'x'
+        response = self.client.post('/admin/core/book/export/', data)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.context['form'].errors['since'])
+
+    def test_export_delta_job(self):
+        Book.objects.create(id=1, name='Some book')
+        Book.objects.create(id=2, name='Other book')
+        BookAdmin.export_job_threshold = 0
+        export_job_workers = admin_module.EXPORT_JOB_WORKERS
+        admin_module.EXPORT_JOB_WORKERS = 0
+        try:
+            data = {'file_format': '0', 'since': '1'}
+            response = self.client.post('/admin/core/book/export/', data)
+            self.assertEqual(response.status_code, 302)
+            job_url = response['Location']
+        finally:
+            BookAdmin.export_job_threshold = None
+            admin_module.EXPORT_JOB_WORKERS = export_job_workers
+
+        response = self.client.get(job_url, {'download': '1'})
+        self.assertEqual(response['X-Export-Watermark'], '2')
+        self.assertNotIn(b'Some book', b''.join(response.streaming_content))
+
+    def test_export_delta_without_watermark(self):
+        class B(resources.Resource):
+            name = fields.Field(attribute='name', column_name='name')
+
+        BookAdmin.resource_class = B
+        try:
+            response = self.client.get('/admin/core/book/export/')
+            self.assertNotIn('since', response.context['form'].fields)
+            response = self.client.post('/admin/core/book/export/',
+                                        {'file_format': '0', 'since': '1'})
+        finally:
+            BookAdmin.resource_class = None
+        self.assertNotIn('X-Export-Watermark', response)
+
+    def test_export_job(self):
+        Book.objects.create(id=1, name='Some book')
+        BookAdmin.export_job_threshold = 0
+        export_job_workers = admin_module.EXPORT_JOB_WORKERS
+        admin_module.EXPORT_JOB_WORKERS = 0
+        try:
+            data = {'file_format': '0'}
+            response = self.client.post('/admin/core/book/export/', data)
+            self.assertEqual(response.status_code, 302)
+            job_url = response['Location']
+        finally:
+            BookAdmin.export_job_threshold = None
+            admin_module.EXPORT_JOB_WORKERS = export_job_workers
+
+        response = self.client.get(job_url)
+        self.assertTemplateUsed(response,
+                                'admin/import_export/export_job.html')
+        self.assertContains(response, '?download=1')
+
+        response = self.client.get(job_url, {'download': '1'})
+        self.assertTrue(response.has_header('Content-Disposition'))
+        self.assertIn(b'Some book', b''.join(response.streaming_content))
+
+        response = self.client.get(job_url, {'download': '1'},
+                                   HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+        User.objects.create_user('other', 'other@example.com', 'password',
+                                 is_staff=True, is_superuser=True)
+        self.client.login(username='other', password='password')
+        response = self.client.get(job_url)
+        self.assertEqual(response.status_code, 403)
+
+    def test_export_fields(self):
+        Book.objects.create(id=1, name='Some book', author_email='a@b.cz')
+        response = self.client.get('/admin/core/book/export/')
+        self.assertContains(response, 'name="export_fields"')
+
+        data = {'file_format': '0', 'export_fields': ['id', 'name']}
+        response = self.client.post('/admin/core/book/export/', data)
+        content = b''.join(response.streaming_content)
+        self.assertEqual(content.splitlines(), [b'id,name', b'1,Some book'])
+
+    def test_export_cache(self):
+        BookAdmin.export_cache_ttl = 60
+        try:
+            Book.objects.create(id=1, name='Some book')
+            data = {'file_format': '0'}
+            response = self.client.post('/admin/core/book/export/', data)
+            self.assertFalse(response.has_header('ETag'))
+            content = b''.join(response.streaming_content)
+            self.assertIn(b'Some book', content)
+
+            book_admin = admin.site._registry[Book]
+            export_cache = book_admin.get_export_cache()
+            resource = book_admin.get_export_resource(None)
+            queryset = book_admin.get_export_queryset(
+                response.wsgi_request)
+            key = export_cache.get_key(
+                resource, base_formats.CSV(), queryset,
+                resource.get_export_version(queryset))
+            with self.assertNumQueries(0):
+                stream = export_cache.open(key)
+            self.assertEqual(stream.read(), content)
+            stream.close()
+
+            Book.objects.create(id=2, name='Other book')
+            response = self.client.post('/admin/core/book/export/', data)
+            self.assertIn(b'Other book',
+                          b''.join(response.streaming_content))
+        finally:
+            BookAdmin.export_cache_ttl = None
+
+    def test_export_xlsx(self):
+        Book.objects.create(id=1, name='Some book')
+        formats = BookAdmin(Book, admin.site).get_export_formats()
+        data = {
+            'file_format': str(formats.index(base_formats.XLSX)),
+            }
+        response = self.client.post('/admin/core/book/export/', data)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        content = b''.join(response.streaming_content)
+        dataset = base_formats.XLSX().create_dataset(content)
+        self.assertEqual(dataset.dict[0]['name'], 'Some book')
+
     def test_import_export_buttons_visible_without_add_permission(self):
         # issue 38 - Export button not visible when no add permission
         original = BookAdmin.has_add_permission
@@ -2,6 +2,12 @@
 from __future__ import unicode_literals
 
 import os
+from datetime import date, datetime
+from decimal import Decimal
+from io import BytesIO
+from unittest import skipUnless
+
+import tablib
 
 from django.test import TestCase
 
@@ -15,8 +21,36 @@ from import_export.formats import base_formats
 
 class XLSTest(TestCase):
 
+    def setUp(self):
+        self.format = base_formats.XLS()
+        self.filename = os.path.join(
+            os.path.dirname(__file__),
+            os.path.pardir,
+            'exports',
+            'books.xls')
+
     def test_binary_format(self):
-        self.assertTrue(base_formats.XLS().is_binary())
+        self.assertTrue(self.format.is_binary())
+
+    def test_import(self):
+        with open(self.filename, 'rb') as in_stream:
+            dataset = self.format.create_dataset(in_stream.read())
+        self.assertEqual(dataset.headers,
+                         ['id', 'name', 'published', 'price'])
+        self.assertEqual(dataset[0], (1, 'Some book',
+                                      datetime(2015, 12, 5), 10.25))
+
+    def test_create_dataset_from_stream(self):
+        with open(self.filename, 'rb') as in_stream:
+            dataset = self.format.create_dataset_from_stream(
+                BytesIO(in_stream.read()))
+        self.assertEqual(dataset[0][:2], (1, 'Some book'))
+
+    def test_create_row_stream(self):
+        rows = self.format.create_row_stream(lambda: open(self.filename, 'rb'))
+        row = next(iter(rows.dict))
+        self.assertEqual(row['name'], 'Some book')
+        self.assertEqual(row['published'], datetime(2015, 12, 5))
 
 
 class XLSXTest(TestCase):
@@ -34,7 +68,67 @@ class XLSXTest(TestCase):
             'exports',
             'books.xlsx')
         in_stream = open(filename, self.format.get_read_mode())
-        self.format.create_dataset(in_stream.read())
+        dataset = self.format.create_dataset(in_stream.read())
+        self.assertEqual(dataset.headers[:2], ['id', 'name'])
+        self.assertEqual(dataset[0][:2], (1, 'Some book'))
+
+    def test_create_row_stream(self):
+        filename = os.path.join(
+            os.path.dirname(__file__),
+            os.path.pardir,
+            'exports',
+            'books.xlsx')
+        rows = self.format.create_row_stream(lambda: open(filename, 'rb'))
+        self.assertEqual(rows.headers[:2], ['id', 'name'])
+        row = next(iter(rows.dict))
+        self.assertEqual(row['id'], 1)
+        self.assertEqual(row['name'], 'Some book')
+
+
+class SheetsTest(TestCase):
+
+    def create_datasets(self, input_format, name, **kwargs):
+        filename = os.path.join(
+            os.path.dirname(__file__),
+            os.path.pardir,
+            'exports',
+            name)
+        with open(filename, 'rb') as stream:
+            return input_format.create_datasets_from_stream(stream, **kwargs)
+
+    def assertSheets(self, input_format, name):
+        datasets = self.create_datasets(input_format, name)
+        self.assertEqual([d.title for d in datasets],
+                         ['first', 'second', 'third'])
+        self.assertEqual(datasets[1].dict[0]['name'], 'Other book')
+
+        datasets = self.create_datasets(input_format, name, concatenate=True)
+        self.assertEqual(len(datasets), 2)
+        self.assertEqual([row[0] for row in datasets[0]], [1, 2])
+        self.assertEqual(datasets[1].headers, ['id', 'name', 'author_email'])
+
+    def test_xlsx(self):
+        self.assertSheets(base_formats.XLSX(), 'books-sheets.xlsx')
+
+    def test_xlsx_not_file_stream(self):
+        filename = os.path.join(os.path.dirname(__file__), os.path.pardir,
+                                'exports', 'books-sheets.xlsx')
+        with open(filename, 'rb') as f:
+            stream = BytesIO(f.read())
+        datasets = base_formats.XLSX().create_datasets_from_stream(stream)
+        self.assertEqual([d.title for d in datasets],
+                         ['first', 'second', 'third'])
+
+    def test_xls(self):
+        self.assertSheets(base_formats.XLS(), 'books-sheets.xls')
+
+    def test_dataset_chain(self):
+        datasets = self.create_datasets(base_formats.XLS(),
+                                        'books-sheets.xls')
+        chain = base_formats.DatasetChain(datasets)
+        self.assertEqual(chain.headers, ['id', 'name', 'author_email'])
+        self.assertEqual(len(chain), 3)
+        self.assertEqual([row['id'] for row in chain.dict], [1, 2, 3])
 
 
 class CSVTest(TestCase):
@@ -62,3 +156,239 @@ class CSVTest(TestCase):
         in_stream = open(filename, self.format.get_read_mode())
         data = force_text(in_stream.read())
         base_formats.CSV().create_dataset(data)
+
+    def test_create_dataset_from_stream(self):
+        filename = os.path.join(
+            os.path.dirname(__file__),
+            os.path.pardir,
+            'exports',
+            'books-dos.csv')
+        with open(filename, 'rb') as in_stream:
+            dataset = self.format.create_dataset_from_stream(in_stream,
+                                                             'utf-8')
+        self.assertEqual(dataset.headers, ['id', 'name', 'author_email'])
+        self.assertEqual(dataset.dict[0]['name'], 'Some book')
+
+    def test_create_dataset_from_stream_multiline(self):
+        data = 'id,name\r\n1,"Ž\r\nline"\r\n'.encode('utf-8')
+        dataset = self.format.create_dataset_from_stream(BytesIO(data),
+                                                         'utf-8')
+        self.assertEqual(dataset.dict[0]['name'], 'Ž\nline')
+
+    def test_iter_text_lines_small_chunks(self):
+        data = 'a,ž\r\nb\rc\n'.encode('utf-8')
+        lines = base_formats.iter_text_lines(BytesIO(data), 'utf-8',
+                                             chunk_size=1)
+        self.assertEqual(list(lines), ['a,ž\n', 'b\n', 'c\n'])
+
+
+class CSVExportChunksTest(TestCase):
+
+    def test_export_chunks(self):
+        dataset = tablib.Dataset(headers=['id', 'name'])
+        dataset.append([1, 'Some "book", 1'])
+        dataset.append([2, None])
+        dataset.append([3, 'Книга'])
+        for csv_format in (base_formats.CSV(), base_formats.TSV()):
+            chunks = list(csv_format.export_chunks(dataset.headers, dataset))
+            self.assertEqual(''.join(chunks),
+                             force_text(csv_format.export_data(dataset)))
+
+    def test_iter_joined(self):
+        chunks = list(base_formats.iter_joined(['ab', 'c', 'de', 'f'], 3))
+        self.assertEqual(chunks, ['abc', 'def'])
+
+
+class RowStreamTest(TestCase):
+
+    def setUp(self):
+        self.data = 'id,name\n1,Some book\n\n2,Ž\n'.encode('utf-8')
+        self.rows = base_formats.CSV().create_row_stream(
+            lambda: BytesIO(self.data), 'utf-8')
+
+    def test_headers(self):
+        self.assertEqual(self.rows.headers, ['id', 'name'])
+
+    def test_dict(self):
+        rows = list(self.rows.dict)
+        self.assertEqual(rows, [{'id': '1', 'name': 'Some book'},
+                                {'id': '2', 'name': 'Ž'}])
+        # file is read again
+        self.assertEqual(len(list(self.rows.dict)), 2)
+
+    def test_invalid_dimensions(self):
+        self.data = b'id,name\n1,Some book,extra\n'
+        with self.assertRaises(ValueError):
+            list(self.rows.dict)
+
+    def test_empty(self):
+        self.data = b''
+        self.assertEqual(self.rows.headers, [])
+        self.assertEqual(list(self.rows.dict), [])
+
+
+class TSVTest(TestCase):
+
+    def test_create_dataset_from_stream(self):
+        data = b'id\tname\n1\tSome book\n'
+        dataset = base_formats.TSV().create_dataset_from_stream(
+            BytesIO(data), 'utf-8')
+        self.assertEqual(dataset.dict[0]['name'], 'Some book')
+
+
+class NDJSONTest(TestCase):
+
+    def setUp(self):
+        self.format = base_formats.NDJSON()
+        self.content = ('{"id": 1, "name": "Some book"}\n'
+                        '\n'
+                        '{"name": "Другая книга", "id": 2}\n')
+
+    def test_create_dataset(self):
+        dataset = self.format.create_dataset(self.content)
+        self.assertEqual(dataset.headers, ['id', 'name'])
+        self.assertEqual(dataset[1], (2, 'Другая книга'))
+
+    def test_create_row_stream(self):
+        content = self.content.encode('utf-8')
+        rows = self.format.create_row_stream(lambda: BytesIO(content),
+                                             'utf-8')
+        self.assertEqual([row['id'] for row in rows.dict], [1, 2])
+
+    def test_export(self):
+        dataset = self.format.create_dataset(self.content)
+        exported = self.format.export_data(dataset)
+        self.assertEqual(exported.splitlines()[1],
+                         '{"id": 2, "name": "Другая книга"}')
+
+        stream = self.format.export_stream(dataset.headers, dataset)
+        dataset = self.format.create_dataset_from_stream(stream, 'utf-8')
+        self.assertEqual(dataset[1], (2, 'Другая книга'))
+
+
+@skipUnless(base_formats.PARQUET_IMPORT, 'pyarrow is not installed')
+class ParquetTest(TestCase):
+
+    def setUp(self):
+        self.format = base_formats.Parquet()
+        self.headers = ['id', 'name', 'published', 'price']
+        self.rows = [
+            [1, 'Some book', datetime(2015, 12, 5).date(), Decimal('10.25')],
+            [2, 'Other book', None, None],
+            [3, 'Third book', datetime(2016, 1, 1).date(), Decimal('1.50')],
+        ]
+
+    def test_export_stream(self):
+        self.format.BATCH_SIZE = 2
+        stream = self.format.export_stream(self.headers, self.rows)
+        self.assertTrue(base_formats.Parquet.sniff(stream.read(4)))
+        stream.seek(0)
+        dataset = self.format.create_dataset_from_stream(stream)
+        self.assertEqual(dataset.headers, self.headers)
+        self.assertEqual([list(row) for row in dataset], self.rows)
+
+    def test_create_row_stream(self):
+        content = self.format.export_stream(self.headers, self.rows).read()
+        rows = self.format.create_row_stream(lambda: BytesIO(content))
+        self.assertEqual([row['price'] for row in rows.dict],
+                         [Decimal('10.25'), None, Decimal('1.50')])
+
+    def test_export_empty_and_mixed_columns(self):
+        content = self.format.export_stream(
+            ['id', 'note'], [[1, None], ['x', None]]).read()
+        dataset = self.format.create_dataset(content)
+        self.assertEqual(dataset[1], ('x', None))
+
+    def test_export_null_first_column(self):
+        self.format.BATCH_SIZE = 1
+        rows = [self.rows[1], self.rows[0]]
+        content = self.format.export_stream(self.headers, rows).read()
+        dataset = self.format.create_dataset(content)
+        self.assertEqual(dataset['published'], [None, '2015-12-05'])
+
+        types = [int, None, date, (Decimal, 10, 2)]
+        content = self.format.export_stream(self.headers, rows, types).read()
+        dataset = self.format.create_dataset(content)
+        self.assertEqual(dataset['published'], [None, date(2015, 12, 5)])
+        self.assertEqual(dataset['price'], [None, Decimal('10.25')])
+
+    def test_export_growing_decimal_scale(self):
+        self.format.BATCH_SIZE = 1
+        rows = [[Decimal('1.5')], [Decimal('1.12345')], [Decimal('12345.6')]]
+        content = self.format.export_stream(['price'], rows).read()
+        dataset = self.format.create_dataset(content)
+        self.assertEqual(dataset['price'], [row[0] for row in rows])
+
+
+class SniffTest(TestCase):
+
+    def read_head(self, name):
+        filename = os.path.join(
+            os.path.dirname(__file__),
+            os.path.pardir,
+            'exports',
+            name)
+        with open(filename, 'rb') as f:
+            return f.read(base_formats.SNIFF_SIZE)
+
+    def test_sniff_xlsx(self):
+        head = self.read_head('books.xlsx')
+        self.assertTrue(base_formats.XLSX.sniff(head))
+        self.assertFalse(base_formats.ODS.sniff(head))
+        self.assertFalse(base_formats.CSV.sniff(head))
+        self.assertFalse(base_formats.JSON.sniff(head))
+
+    def test_sniff_xls(self):
+        head = base_formats.OLE_MAGIC + b'\x00' * 100
+        self.assertTrue(base_formats.XLS.sniff(head))
+        self.assertFalse(base_formats.CSV.sniff(head))
+
+    def test_sniff_csv(self):
+        head = self.read_head('books.csv')
+        self.assertTrue(base_formats.CSV.sniff(head))
+        self.assertFalse(base_formats.TSV.sniff(head))
+        self.assertFalse(base_formats.XLSX.sniff(head))
+
+    def test_sniff_tsv(self):
+        head = b'id\tname\n1\tSome book\n2\tOther book\n'
+        self.assertTrue(base_formats.TSV.sniff(head))
+        self.assertFalse(base_formats.CSV.sniff(head))
+
+    def test_sniff_json(self):
+        self.assertTrue(base_formats.JSON.sniff(b'\xef\xbb\xbf [{"id": 1}]'))
+        self.assertFalse(base_formats.JSON.sniff(b'id,name\n'))
+
+    def test_sniff_ndjson(self):
+        head = b'{"id": 1}\n{"id": 2}\n'
+        self.assertTrue(base_formats.NDJSON.sniff(head))
+        self.assertFalse(base_formats.JSON.sniff(head))
+        head = b'{\n  "id": 1\n}\n'
+        self.assertFalse(base_formats.NDJSON.sniff(head))
+        self.assertTrue(base_formats.JSON.sniff(head))
+        # single record is both
+        head = b'{"id": 1, "name": "Some book"}\n'
+        self.assertTrue(base_formats.NDJSON.sniff(head))
+        self.assertTrue(base_formats.JSON.sniff(head))
+        self.assertTrue(base_formats.NDJSON.sniff(head.strip()))
+
+    def test_sniff_csv_rejects_json(self):
+        for head in (b'[{"id": 1, "name": "Some book"}]',
+                     b'{"id": 1, "name": "a"}\n{"id": 2, "name": "b"}\n'):
+            self.assertFalse(base_formats.CSV.sniff(head))
+            self.assertFalse(base_formats.TSV.sniff(head))
+
+    def test_sniff_format_prefers_extension(self):
+        formats = [base_formats.CSV, base_formats.JSON]
+        head = b'[1]'
+        self.assertEqual(base_formats.sniff_format(formats, head),
+                         base_formats.JSON)
+        self.assertIsNone(base_formats.sniff_format(formats, b'\x00\x01'))
+
+    def test_sniff_format_keeps_extension_without_sniff(self):
+        formats = [base_formats.CSV, base_formats.YAML]
+        head = b'- {id: 1, name: Some book}\n- {id: 2, name: Other}\n'
+        self.assertFalse(base_formats.YAML.can_sniff())
+        self.assertTrue(base_formats.CSV.can_sniff())
+        self.assertEqual(base_formats.sniff_format(formats, head,
+                                                   base_formats.YAML),
+                         base_formats.YAML)
@@ -1,20 +1,27 @@
 from __future__ import unicode_literals
 
+import os
+import shutil
+import tempfile
 from decimal import Decimal
+from io import BytesIO, StringIO
 from datetime import date
 from copy import deepcopy
 from unittest import (
     skip,
+    skipIf,
 )
 
-from django.db import models
-from django.db.models import Count
+from django.core.management import call_command
+from django.db import connection, models
+from django.db.models import Count, Max
 from django.db.models.fields import FieldDoesNotExist
 from django.test import (
     skipUnlessDBFeature,
     TestCase,
     TransactionTestCase,
     )
+from django.utils import six
 from django.utils.html import strip_tags
 from django.contrib.auth.models import User
 
@@ -24,7 +31,13 @@ from import_export import resources
 from import_export import fields
 from import_export import widgets
 from import_export import results
-from import_export.instance_loaders import ModelInstanceLoader
+from import_export import parallel
+from import_export import plans
+from import_export.formats.base_formats import CSV
+from import_export.instance_loaders import (
+    CachedInstanceLoader,
+    ModelInstanceLoader,
+)
 
 from core.models import Book, Author, Category, Entry, Profile, WithDefault, WithDynamicDefault
 
@@ -215,6 +228,68 @@ class ModelResourceTest(TestCase):
         dataset = self.resource.export(Book.objects.all())
         self.assertEqual(len(dataset), 1)
 
+    def test_iter_export(self):
+        rows = self.resource.iter_export(Book.objects.all())
+        self.assertEqual(next(rows), self.resource.export_resource(self.book))
+        self.assertRaises(StopIteration, next, rows)
+
+    def test_iter_export_typed(self):
+        self.book.price = Decimal('10.25')
+        self.book.save()
+        row = next(self.resource.iter_export(Book.objects.all(), typed=True))
+        headers = self.resource.get_export_headers()
+        self.assertEqual(row[headers.index('price')], Decimal('10.25'))
+        self.assertIsNone(row[headers.index('published_date')])
+
+    def test_export_old_style_overrides(self):
+        class UpperField(fields.Field):
+            def export(self, obj):
+                return super(UpperField, self).export(obj).upper()
+
+        class B(resources.ModelResource):
+            name = UpperField(attribute='name', column_name='name')
+
+            class Meta:
+                model = Book
+                fields = ('id', 'name', 'price')
+
+            def export_field(self, field, obj):
+                value = super(B, self).export_field(field, obj)
+                return '*%s' % value if field.column_name == 'id' else value
+
+        resource = B()
+        row = resource.export(Book.objects.all()).dict[0]
+        self.assertEqual(row['name'], 'SOME BOOK')
+        self.assertEqual(row['id'], '*%s' % self.book.pk)
+        row = next(resource.iter_export(Book.objects.all(), typed=True))
+        self.assertEqual(row[:2], ['SOME BOOK', '*%s' % self.book.pk])
+
+        class C(resources.ModelResource):
+            class Meta:
+                model = Book
+                fields = ('id', 'name')
+
+            def export_resource(self, obj):
+                return [obj.pk, obj.name.lower()]
+
+        self.assertEqual(C().export(Book.objects.all()).dict[0]['name'],
+                         'some book')
+
+    def test_get_export_types(self):
+        class B(resources.ModelResource):
+            class Meta:
+                model = Book
+                fields = ('id', 'name', 'published', 'price')
+
+        self.assertEqual(B().get_export_types(),
+                         [int, None, date, (Decimal, 10, 2)])
+
+        class C(B):
+            def dehydrate_price(self, obj):
+                return '%s EUR' % obj.price
+
+        self.assertEqual(C().get_export_types(), [int, None, date, None])
+
     def test_export_iterable(self):
         dataset = self.resource.export(list(Book.objects.all()))
         self.assertEqual(len(dataset), 1)
@@ -254,6 +329,94 @@ class ModelResourceTest(TestCase):
         self.assertEqual(instance.author_email, 'test@example.com')
         self.assertEqual(instance.price, Decimal("10.25"))
 
+    def test_import_datasets(self):
+        other = tablib.Dataset(headers=['id', 'name', 'author_email'])
+        other.append(['', 'Other book', 'other@example.com'])
+        result = self.resource.import_datasets([self.dataset, other],
+                                               raise_errors=True)
+
+        self.assertFalse(result.has_errors())
+        self.assertEqual([row.import_type for row in result.rows],
+                         [results.RowResult.IMPORT_TYPE_UPDATE,
+                          results.RowResult.IMPORT_TYPE_NEW])
+        self.assertEqual(
+            Book.objects.get(name='Other book').author_email,
+            'other@example.com')
+
+    def test_import_data_collect_plan(self):
+        result = self.resource.import_data(self.dataset, dry_run=True,
+                                           collect_plan=True)
+        self.assertEqual(len(result.plan), 1)
+        self.assertEqual(list(result.plan)[0].import_type,
+                         results.RowResult.IMPORT_TYPE_UPDATE)
+        self.assertEqual(Book.objects.get(pk=self.book.pk).author_email, '')
+
+        result = self.resource.replay_plan(result.plan, raise_errors=True)
+        self.assertFalse(result.has_errors())
+        self.assertEqual(result.rows[0].object_id, self.book.pk)
+        instance = Book.objects.get(pk=self.book.pk)
+        self.assertEqual(instance.author_email, 'test@example.com')
+        self.assertEqual(instance.price, Decimal("10.25"))
+
+    def test_replay_plan_keeps_concurrent_changes(self):
+        result = self.resource.import_data(self.dataset, dry_run=True,
+                                           collect_plan=True)
+        self.assertEqual(list(result.plan)[0].fields,
+                         ['author_email', 'price'])
+        Book.objects.filter(pk=self.book.pk).update(
+            published=date(2016, 1, 1))
+
+        self.resource.replay_plan(result.plan, raise_errors=True)
+        instance = Book.objects.get(pk=self.book.pk)
+        self.assertEqual(instance.author_email, 'test@example.com')
+        self.assertEqual(instance.published, date(2016, 1, 1))
+
+        Book.objects.all().delete()
+        result = self.resource.replay_plan(result.plan)
+        self.assertTrue(result.has_errors())
+
+    def test_import_plan_version_modified_field(self):
+        class B(BookResource):
+            class Meta:
+                model = Book
+                modified_field = 'published'
+
+        resource = B()
+        version = resource.get_import_plan_version()
+        Book.objects.filter(pk=self.book.pk).update(
+            published=date(2016, 1, 1))
+        self.assertNotEqual(resource.get_import_plan_version(), version)
+
+    def test_replay_plan_new_and_m2m(self):
+        cat1 = Category.objects.create(name='Cat 1')
+        dataset = tablib.Dataset(headers=['id', 'name', 'categories'])
+        dataset.append([None, 'FooBook', "%s" % cat1.pk])
+        result = self.resource.import_data(dataset, dry_run=True,
+                                           collect_plan=True)
+        plan = plans.ImportPlan.loads(result.plan.dumps())
+        self.assertFalse(plan.is_stale(self.resource.get_import_plan_version()))
+
+        self.resource.replay_plan(plan, raise_errors=True)
+        book = Book.objects.get(name='FooBook')
+        self.assertIn(cat1, book.categories.all())
+        self.assertTrue(plan.is_stale(self.resource.get_import_plan_version()))
+
+    def test_import_data_row_stream(self):
+        data = ('id,name,author_email\n%s,Some book,test@example.com\n'
+                ',New book,\n' % self.book.pk).encode('utf-8')
+        dataset = CSV().create_row_stream(lambda: BytesIO(data), 'utf-8')
+
+        class B(BookResource):
+            class Meta:
+                instance_loader_class = CachedInstanceLoader
+
+        result = B().import_data(dataset, raise_errors=True)
+        self.assertEqual([row.import_type for row in result.rows],
+                         [results.RowResult.IMPORT_TYPE_UPDATE,
+                          results.RowResult.IMPORT_TYPE_NEW])
+        self.assertEqual(Book.objects.get(pk=self.book.pk).author_email,
+                         'test@example.com')
+
     def test_import_data_value_error_includes_field_name(self):
         class AuthorResource(resources.ModelResource):
             class Meta:
@@ -315,6 +478,83 @@ class ModelResourceTest(TestCase):
         result = resource.fields['author__name'].export(self.book)
         self.assertEqual(result, author.name)
 
+    def test_export_related_lookups(self):
+
+        class B(resources.ModelResource):
+            class Meta:
+                model = Book
+                fields = ('id', 'author', 'author__name', 'categories')
+                export_chunk_size = 2
+
+        resource = B()
+        self.assertEqual(resource.get_related_lookups(),
+                         (['author'], ['categories']))
+
+        author = Author.objects.create(name="Author")
+        category = Category.objects.create(name="Category")
+        for i in range(3):
+            book = Book.objects.create(name="Book %s" % i, author=author)
+            book.categories.add(category)
+        # one query with join for books, one prefetch per chunk
+        with self.assertNumQueries(3):
+            dataset = resource.export(Book.objects.all())
+        self.assertEqual(dataset.dict[1]['author__name'], 'Author')
+        self.assertEqual(dataset.dict[1]['categories'], str(category.pk))
+
+    def test_export_values_list(self):
+
+        class B(resources.ModelResource):
+            class Meta:
+                model = Book
+                fields = ('id', 'name', 'author', 'author__name', 'price',
+                          'published')
+
+        author = Author.objects.create(name="Author")
+        Book.objects.create(name="Other book", author=author,
+                            price=Decimal("10.25"), published=date(2015, 1, 1))
+        resource = B()
+        self.assertEqual([lookup for lookup, render
+                          in resource.get_values_list_columns()],
+                         ['id', 'name', 'author__pk', 'published', 'price',
+                          'author__name'])
+        with self.assertNumQueries(1):
+            dataset = resource.export(Book.objects.order_by('pk'))
+        self.assertEqual(dataset.dict,
+                         resource.export(list(Book.objects.order_by('pk'))).dict)
+        self.assertEqual(dataset.dict[1]['author'], author.pk)
+        self.assertEqual(dataset.dict[1]['published'], '2015-01-01')
+
+    def test_export_values_list_fallback(self):
+        self.assertIsNone(self.resource.get_values_list_columns())
+
+        class B(resources.ModelResource):
+            class Meta:
+                model = Book
+                fields = ('id', 'name')
+
+            def dehydrate_name(self, obj):
+                return obj.name.upper()
+
+        self.assertIsNone(B().get_values_list_columns())
+        self.assertEqual(B().export().dict[0]['name'], 'SOME BOOK')
+
+    def test_export_values_list_foreign_key_property(self):
+        class B(resources.ModelResource):
+            author = fields.Field(
+                attribute='author', column_name='author',
+                widget=widgets.ForeignKeyWidget(Author, 'upper_name'))
+
+            class Meta:
+                model = Book
+                fields = ('author', )
+
+        author = Author.objects.create(name="Author")
+        Book.objects.create(name="Other book", author=author)
+        resource = B()
+        self.assertIsNone(resource.get_values_list_columns())
+        self.assertEqual(resource.export(Book.objects.order_by('pk'))['author'],
+                         ['', 'AUTHOR'])
+
     def test_dehydrating_fields(self):
 
         class B(resources.ModelResource):
@@ -334,6 +574,270 @@ class ModelResourceTest(TestCase):
         self.assertEqual(full_title, '%s by %s' % (self.book.name,
                                                    self.book.author.name))
 
+    def test_dehydrate_batch(self):
+
+        class B(resources.ModelResource):
+            books_count = fields.Field()
+
+            class Meta:
+                model = Author
+                fields = ('id', 'books_count')
+                export_chunk_size = 2
+
+            def dehydrate_books_count_batch(self, objs):
+                pks = [obj.pk for obj in objs]
+                return dict(Author.objects.filter(pk__in=pks)
+                            .annotate(count=Count('book'))
+                            .values_list('pk', 'count'))
+
+        for i in range(3):
+            author = Author.objects.create(name="Author %s" % i)
+            Book.objects.create(name="Book", author=author)
+        resource = B()
+        # one query for authors, one per chunk
+        with self.assertNumQueries(3):
+            dataset = resource.export(Author.objects.order_by('pk'))
+        self.assertEqual([row['books_count'] for row in dataset.dict],
+                         [1, 1, 1])
+        self.assertEqual(
+            resource.export_field(resource.fields['books_count'], author), 1)
+
+    def test_export_expression_fields(self):
+
+        class B(resources.ModelResource):
+            books_count = fields.Field(expression=Count('book'))
+            max_price = fields.Field(expression=Max('book__price'),
+                                     widget=widgets.DecimalWidget())
+
+            class Meta:
+                model = Author
+                fields = ('id', 'name')
+
+        author = Author.objects.create(name="Author")
+        Book.objects.create(name="Book", author=author, price=Decimal("5"))
+        Book.objects.create(name="Book", author=author, price=Decimal("7"))
+        resource = B()
+        self.assertTrue(resource.fields['books_count'].readonly)
+        with self.assertNumQueries(1):
+            dataset = resource.export(Author.objects.all())
+        self.assertEqual(dataset.dict[0]['books_count'], '2')
+        self.assertEqual(dataset.dict[0]['max_price'], Decimal("7"))
+
+        # instance path reads annotated attributes
+        B.dehydrate_name = lambda self, obj: obj.name.upper()
+        dataset = resource.export(Author.objects.all())
+        self.assertEqual(dataset.dict[0]['books_count'], '2')
+        self.assertEqual(dataset.dict[0]['name'], 'AUTHOR')
+
+    def test_export_parallel(self):
+        for i in range(4):
+            Book.objects.create(name="Book %s" % i)
+        csv_format = CSV()
+        expected = ''.join(csv_format.export_chunks(
+            self.resource.get_export_headers(),
+            self.resource.iter_export(Book.objects.order_by('pk'))))
+
+        queryset = Book.objects.all()
+        self.assertEqual(len(parallel.get_pk_ranges(queryset, 3)), 3)
+        self.assertEqual(
+            self.resource.export_parallel(csv_format, queryset, processes=1,
+                                          partitions=3),
+            expected)
+
+        stream = StringIO()
+        self.resource.export_parallel(csv_format, queryset.filter(pk=0),
+                                      stream, processes=1)
+        self.assertEqual(stream.getvalue().splitlines(),
+                         expected.splitlines()[:1])
+
+    def test_export_parallel_falls_back_to_current_process(self):
+        Book.objects.create(name="Some other book")
+        csv_format = CSV()
+        expected = ''.join(csv_format.export_chunks(
+            self.resource.get_export_headers(),
+            self.resource.iter_export(Book.objects.order_by('pk'))))
+        # test runs in an atomic block
+        self.assertEqual(
+            self.resource.export_parallel(csv_format, Book.objects.all(),
+                                          processes=2),
+            expected)
+        self.assertEqual(Book.objects.count(), 2)
+
+        resource = resources.modelresource_factory(Book)()
+        task = (type(resource), None, CSV, Book, Book.objects.all().query,
+                None, None, True)
+        self.assertFalse(parallel.can_export_in_processes([task]))
+
+    def test_export_delta(self):
+        data, watermark, deleted = self.resource.export_delta()
+        self.assertEqual(len(data), 1)
+        self.assertEqual(watermark, self.book.pk)
+        self.assertEqual(deleted, [])
+
+        book = Book.objects.create(name="New book")
+        data, watermark, deleted = self.resource.export_delta(watermark)
+        self.assertEqual(data.dict[0]['name'], "New book")
+        self.assertEqual(len(data), 1)
+        self.assertEqual(watermark, book.pk)
+
+        data, new_watermark, deleted = self.resource.export_delta(watermark)
+        self.assertEqual(len(data), 0)
+        self.assertEqual(new_watermark, watermark)
+        self.assertEqual(self.resource.parse_watermark(
+            self.resource.format_watermark(watermark)), watermark)
+
+    def test_export_delta_modified_field(self):
+        class A(resources.ModelResource):
+
+            class Meta:
+                model = Author
+                fields = ('name',)
+                modified_field = 'birthday'
+
+            def get_deleted_keys(self, since, watermark):
+                return [0]
+
+        resource = A()
+        author = Author.objects.create(name="Author")
+        data, watermark, deleted = resource.export_delta()
+        self.assertEqual(watermark, author.birthday)
+        self.assertEqual(deleted, [])
+
+        since = resource.parse_watermark(resource.format_watermark(
+            watermark))
+        self.assertEqual(since, watermark)
+        data, watermark, deleted = resource.export_delta(since)
+        self.assertEqual(len(data), 0)
+        self.assertEqual(deleted, [0])
+
+    def test_export_resource_command(self):
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            output = os.path.join(tmp_dir, 'books.csv')
+            watermark_file = os.path.join(tmp_dir, 'watermark')
+            err = six.StringIO()
+            call_command('export_resource',
+                         'core.tests.resources_tests.BookResource',
+                         output=output, watermark_file=watermark_file,
+                         stderr=err)
+            with open(output, 'rb') as f:
+                self.assertIn(b'Some book', f.read())
+            with open(watermark_file) as f:
+                self.assertEqual(f.read(), str(self.book.pk))
+            self.assertIn('Watermark: %s' % self.book.pk, err.getvalue())
+
+            Book.objects.create(name="New book")
+            call_command('export_resource',
+                         'core.tests.resources_tests.BookResource',
+                         format='json', output=output, fields='id,name',
+                         watermark_file=watermark_file, stderr=err)
+            with open(output, 'rb') as f:
+                content = f.read()
+            self.assertIn(b'New book', content)
+            self.assertNotIn(b'price', content)
+            self.assertNotIn(b'Some book', content)
+        finally:
+            shutil.rmtree(tmp_dir)
+
+    def test_export_fields(self):
+        author = Author.objects.create(name="Author")
+        self.book.author = author
+        self.book.save()
+        dataset = self.resource.export(Book.objects.all(),
+                                       fields=['name', 'id'])
+        self.assertEqual(dataset.headers, ['id', 'name'])
+        self.assertEqual(dataset[0], (self.book.pk, 'Some book'))
+        self.assertIsNone(self.resource.export_fields)
+
+        resource = BookResource()
+        self.assertEqual(resource.get_related_lookups(), (['author'],
+                                                          ['categories']))
+        resource.export_fields = ['name']
+        self.assertEqual(resource.get_only_fields(), ['id', 'name'])
+        self.assertEqual(resource.get_related_lookups(), ([], []))
+        queryset = Book.objects.select_related('author')
+        with self.assertNumQueries(1):
+            objs = next(resource.iter_export_chunks(queryset))
+            self.assertEqual(objs[0].name, 'Some book')
+        with self.assertNumQueries(1):
+            objs[0].price
+
+        resource.export_fields = ['name', 'author']
+        self.assertEqual(resource.get_only_fields(), ['id', 'name', 'author'])
+        self.assertEqual(resource.get_related_lookups(), (['author'], []))
+
+        resource.export_fields = ['unknown']
+        self.assertRaises(ValueError, resource.export)
+
+    def test_export_overridden_widget_render(self):
+        class UpperCharWidget(widgets.CharWidget):
+            def render(self, value):
+                return super(UpperCharWidget, self).render(value).upper()
+
+        class B(resources.ModelResource):
+            name = fields.Field(attribute='name', column_name='name',
+                                widget=UpperCharWidget())
+
+            class Meta:
+                model = Book
+                fields = ('name', )
+
+        resource = B()
+        self.assertIsNotNone(resource.get_values_list_columns())
+        self.assertEqual(list(resource.iter_export(Book.objects.all())),
+                         [['SOME BOOK']])
+        self.assertEqual(
+            list(resource.iter_export(Book.objects.all(), typed=True)),
+            [['SOME BOOK']])
+
+    def test_import_clean_rows_shared_column(self):
+        class B(resources.ModelResource):
+            author = fields.Field(attribute='author', column_name='author',
+                                  widget=widgets.ForeignKeyWidget(Author))
+            author_id = fields.Field(attribute='author_email',
+                                     column_name='author',
+                                     widget=widgets.IntegerWidget())
+
+            class Meta:
+                model = Book
+                fields = ('id', 'name', 'author', 'author_id')
+
+        author = Author.objects.create(name="Author")
+        dataset = tablib.Dataset(headers=['id', 'name', 'author'])
+        dataset.append(['', 'New book', str(author.pk)])
+        resource = B()
+        self.assertEqual(resource.clean_rows(list(dataset.dict))[0].cleaned,
+                         {'id': None})
+        resource.import_data(dataset, raise_errors=True)
+        book = Book.objects.get(name='New book')
+        self.assertEqual(book.author, author)
+        self.assertEqual(book.author_email, str(author.pk))
+
+    def test_import_clean_rows(self):
+        class B(resources.ModelResource):
+            class Meta:
+                model = Book
+                fields = ('id', 'name', 'price', 'published')
+                widgets = {
+                    'published': {'format': '%d.%m.%Y'},
+                }
+
+        resource = B()
+        self.assertEqual([f.column_name for f in
+                          resource.get_clean_many_fields()],
+                         ['id', 'published', 'price'])
+        dataset = tablib.Dataset(headers=['id', 'name', 'price', 'published'])
+        dataset.append(['', 'New book', '1.5', '10.01.2016'])
+        dataset.append(['', 'Bad book', '2', '2016-01-10'])
+        rows = resource.clean_rows(list(dataset.dict))
+        self.assertEqual(rows[0].cleaned, {'id': None,
+                                           'price': Decimal('1.5')})
+
+        result = resource.import_data(dataset, raise_errors=False)
+        self.assertEqual(len(result.rows[1].errors), 1)
+        self.assertEqual(Book.objects.get(name='New book').published,
+                         date(2016, 1, 10))
+
     def test_widget_fomat_in_fk_field(self):
         class B(resources.ModelResource):
 
@@ -648,6 +1152,20 @@ class ModelResourceTransactionTest(TransactionTestCase):
         # check that it is really rollbacked
         self.assertFalse(Book.objects.filter(name='FooBook'))
 
+    @skipIf(connection.vendor == 'sqlite',
+            "in-memory test database is not shared with worker processes")
+    def test_export_parallel_processes(self):
+        for i in range(4):
+            Book.objects.create(name="Book %s" % i)
+        csv_format = CSV()
+        expected = ''.join(csv_format.export_chunks(
+            self.resource.get_export_headers(),
+            self.resource.iter_export(Book.objects.order_by('pk'))))
+        self.assertEqual(
+            self.resource.export_parallel(csv_format, Book.objects.all(),
+                                          processes=2, partitions=3),
+            expected)
+
 
 class ModelResourceFactoryTest(TestCase):
 
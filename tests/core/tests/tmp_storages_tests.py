@@ -1,11 +1,22 @@
 # -*- coding: utf-8 -*-
+import gzip
 import os
+import time
 
+from django.core.management import call_command
 from django.test import TestCase
+from django.utils.six import StringIO
 from django.core.cache import cache
 from django.core.files.storage import default_storage
+from import_export.export_cache import ExportCache
+from import_export import tmp_storages
+from import_export.export_jobs import ExportJob
 from import_export.tmp_storages import (
     CacheStorage,
+    ChunkedCacheStorage,
+    CompressedMediaStorage,
+    CompressedStorage,
+    CompressedTempFolderStorage,
     MediaStorage,
     TempFolderStorage
     )
@@ -32,6 +43,16 @@ id,name,author,author_email,imported,published,price,categories
         tmp_storage.remove()
         self.assertFalse(os.path.isfile(tmp_storage.get_full_path()))
 
+    def test_temp_folder_storage_save_chunks(self):
+        tmp_storage = TempFolderStorage()
+        tmp_storage.save_chunks(iter(self.test_string.splitlines(True)))
+
+        tmp_storage = TempFolderStorage(name=tmp_storage.name)
+        self.assertEqual(self.test_string, tmp_storage.read('rb'))
+        with tmp_storage.open_stream() as stream:
+            self.assertEqual(self.test_string, stream.read())
+        tmp_storage.remove()
+
     def test_cache_storage(self):
         tmp_storage = CacheStorage()
         tmp_storage.save(self.test_string)
@@ -43,7 +64,44 @@ id,name,author,author_email,imported,published,price,categories
         self.assertNotEqual(cache.get(tmp_storage.CACHE_PREFIX,
                                       tmp_storage.name), None)
         tmp_storage.remove()
-        self.assertEqual(cache.get(tmp_storage.name), None)
+        self.assertEqual(cache.get(tmp_storage.get_cache_key()), None)
+
+    def test_cache_storage_save_chunks(self):
+        tmp_storage = CacheStorage()
+        tmp_storage.save_chunks(iter(self.test_string.splitlines(True)))
+
+        tmp_storage = CacheStorage(name=tmp_storage.name)
+        self.assertEqual(self.test_string, tmp_storage.read())
+        with tmp_storage.open_stream() as stream:
+            self.assertEqual(self.test_string, stream.read())
+
+    def test_chunked_cache_storage(self):
+        class SmallChunkStorage(ChunkedCacheStorage):
+            CHUNK_SIZE = 16
+
+        tmp_storage = SmallChunkStorage()
+        tmp_storage.save_chunks(iter(self.test_string.splitlines(True)))
+        name = tmp_storage.name
+
+        tmp_storage = SmallChunkStorage(name=name)
+        self.assertEqual(self.test_string, tmp_storage.read())
+        with tmp_storage.open_stream() as stream:
+            self.assertEqual(self.test_string[:5], stream.read(5))
+            self.assertEqual(self.test_string[5:], stream.read())
+
+        chunk_key = tmp_storage.get_chunk_key(0)
+        self.assertNotEqual(cache.get(chunk_key), None)
+        tmp_storage.remove()
+        self.assertEqual(cache.get(tmp_storage.get_cache_key()), None)
+        self.assertEqual(cache.get(chunk_key), None)
+
+    def test_chunked_cache_storage_expired_chunk(self):
+        tmp_storage = ChunkedCacheStorage()
+        tmp_storage.save(self.test_string)
+        cache.delete(tmp_storage.get_chunk_key(0))
+        with self.assertRaises(IOError):
+            tmp_storage.read()
+        tmp_storage.remove()
 
     def test_media_storage(self):
         tmp_storage = MediaStorage()
@@ -56,3 +114,175 @@ id,name,author,author_email,imported,published,price,categories
         self.assertTrue(default_storage.exists(tmp_storage.get_full_path()))
         tmp_storage.remove()
         self.assertFalse(default_storage.exists(tmp_storage.get_full_path()))
+
+    def test_media_storage_save_chunks(self):
+        tmp_storage = MediaStorage()
+        tmp_storage.save_chunks(iter(self.test_string.splitlines(True)))
+
+        tmp_storage = MediaStorage(name=tmp_storage.name)
+        self.assertEqual(self.test_string, tmp_storage.read())
+        with tmp_storage.open_stream() as stream:
+            self.assertEqual(self.test_string, stream.read())
+        tmp_storage.remove()
+
+    def test_compressed_temp_folder_storage(self):
+        tmp_storage = CompressedTempFolderStorage()
+        tmp_storage.save_chunks(iter(self.test_string.splitlines(True)))
+        name = tmp_storage.name
+
+        tmp_storage = CompressedTempFolderStorage(name=name)
+        with tmp_storage.open_stream() as stream:
+            self.assertEqual(self.test_string, stream.read())
+        with gzip.open(tmp_storage.storage.get_full_path()) as file:
+            self.assertEqual(self.test_string, file.read())
+        tmp_storage.remove()
+        self.assertFalse(os.path.isfile(tmp_storage.storage.get_full_path()))
+
+    def test_compressed_media_storage(self):
+        tmp_storage = CompressedMediaStorage()
+        tmp_storage.save(self.test_string)
+
+        tmp_storage = CompressedMediaStorage(name=tmp_storage.name)
+        self.assertEqual(self.test_string, tmp_storage.read())
+        self.assertNotEqual(self.test_string, tmp_storage.storage.read())
+        tmp_storage.remove()
+
+    def test_compressed_cache_storage(self):
+        class CompressedCacheStorage(CompressedStorage):
+            storage_class = CacheStorage
+
+        tmp_storage = CompressedCacheStorage()
+        tmp_storage.save_chunks(iter(self.test_string.splitlines(True)))
+
+        tmp_storage = CompressedCacheStorage(name=tmp_storage.name)
+        self.assertEqual(self.test_string, tmp_storage.read())
+        tmp_storage.remove()
+
+    def test_temp_folder_storage_sweep(self):
+        old_storage = TempFolderStorage()
+        old_storage.save(self.test_string)
+        an_hour_ago = time.time() - 3600
+        os.utime(old_storage.get_full_path(), (an_hour_ago, an_hour_ago))
+        new_storage = TempFolderStorage()
+        new_storage.save(self.test_string)
+
+        self.assertTrue(TempFolderStorage.sweep(60) >= 1)
+        self.assertFalse(os.path.isfile(old_storage.get_full_path()))
+        self.assertTrue(os.path.isfile(new_storage.get_full_path()))
+        new_storage.remove()
+
+    def test_temp_folder_storage_sweep_limit(self):
+        an_hour_ago = time.time() - 3600
+        for i in range(3):
+            tmp_storage = TempFolderStorage()
+            tmp_storage.save(self.test_string)
+            os.utime(tmp_storage.get_full_path(), (an_hour_ago, an_hour_ago))
+
+        self.assertEqual(TempFolderStorage.sweep(60, limit=2), 2)
+        self.assertTrue(TempFolderStorage.sweep(60) >= 1)
+        self.assertEqual(TempFolderStorage.sweep(60), 0)
+
+    def test_media_storage_sweep(self):
+        tmp_storage = MediaStorage()
+        tmp_storage.save(self.test_string)
+
+        self.assertEqual(MediaStorage.sweep(60), 0)
+        self.assertTrue(default_storage.exists(tmp_storage.get_full_path()))
+        time.sleep(0.01)
+        self.assertTrue(MediaStorage.sweep(0) >= 1)
+        self.assertFalse(default_storage.exists(tmp_storage.get_full_path()))
+
+    def test_media_storage_sweep_get_modified_time(self):
+        class Storage(object):
+            # storage of Django >= 2.0 without ``modified_time``
+            def get_modified_time(self, name):
+                return default_storage.modified_time(name)
+
+            def __getattr__(self, name):
+                if name == 'modified_time':
+                    raise AttributeError(name)
+                return getattr(default_storage, name)
+
+        tmp_storage = MediaStorage()
+        tmp_storage.save(self.test_string)
+        old_storage = tmp_storages.default_storage
+        tmp_storages.default_storage = Storage()
+        try:
+            time.sleep(0.01)
+            self.assertTrue(MediaStorage.sweep(0) >= 1)
+        finally:
+            tmp_storages.default_storage = old_storage
+        self.assertFalse(default_storage.exists(tmp_storage.get_full_path()))
+
+    def test_sweep_command(self):
+        tmp_storage = TempFolderStorage()
+        tmp_storage.save(self.test_string)
+        an_hour_ago = time.time() - 3600
+        os.utime(tmp_storage.get_full_path(), (an_hour_ago, an_hour_ago))
+
+        out = StringIO()
+        call_command('sweep_import_export_tmp', max_age=60, batch_size=1,
+                     stdout=out)
+        self.assertFalse(os.path.isfile(tmp_storage.get_full_path()))
+        self.assertIn('TempFolderStorage: removed', out.getvalue())
+
+
+class ExportCacheTest(TestCase):
+
+    def setUp(self):
+        cache.delete(ExportCache.INDEX_KEY)
+        self.export_cache = ExportCache(TempFolderStorage, ttl=60,
+                                        max_size=10)
+
+    def tearDown(self):
+        self.export_cache.max_size = 0
+        self.export_cache.evict(self.export_cache.get_index())
+        cache.delete(ExportCache.INDEX_KEY)
+
+    def test_set_open(self):
+        self.assertIsNone(self.export_cache.open('a'))
+        self.export_cache.set('a', iter(['id,', 'name\r\n']))
+        with self.export_cache.open('a') as stream:
+            self.assertEqual(stream.read(), b'id,name\r\n')
+
+    def test_evict_oldest(self):
+        self.export_cache.set('a', b'123456')
+        self.export_cache.set('b', '123456')
+        self.assertIsNone(self.export_cache.open('a'))
+        with self.export_cache.open('b') as stream:
+            self.assertEqual(stream.read(), b'123456')
+
+    def test_expired(self):
+        self.export_cache.set('a', b'123')
+        self.export_cache.ttl = -1
+        self.assertIsNone(self.export_cache.open('a'))
+
+
+class ExportJobTest(TestCase):
+
+    def wait(self, job):
+        for i in range(100):
+            job = ExportJob.get(job.id)
+            if job.is_finished():
+                return job
+            time.sleep(0.05)
+        self.fail("Export job did not finish")
+
+    def test_start(self):
+        job = ExportJob('books.csv', 'text/csv', ttl=60)
+        job.start(lambda: iter(['id\r\n', '1\r\n']), 1)
+        job = self.wait(job)
+        self.assertEqual(job.status, ExportJob.DONE)
+        with job.open_stream() as stream:
+            self.assertEqual(stream.read(), b'id\r\n1\r\n')
+        TempFolderStorage(name=job.name).remove()
+
+    def test_failed(self):
+        def get_export_data():
+            raise ValueError("Broken export")
+
+        job = ExportJob('books.csv', 'text/csv', ttl=60)
+        job.start(get_export_data, 0)
+        job = ExportJob.get(job.id)
+        self.assertEqual(job.status, ExportJob.FAILED)
+        self.assertEqual(job.error, "Broken export")
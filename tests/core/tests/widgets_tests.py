@@ -29,6 +29,12 @@ class BooleanWidgetTest(TestCase):
     def test_render(self):
         self.assertEqual(self.widget.render(None), "")
 
+    def test_many(self):
+        values = ["1", 1, "0", "", None]
+        self.assertEqual(self.widget.clean_many(values),
+                         [self.widget.clean(v) for v in values])
+        self.assertEqual(self.widget.render_many([True, False]), ["1", "0"])
+
 
 class DateWidgetTest(TestCase):
 
@@ -45,11 +51,28 @@ class DateWidgetTest(TestCase):
     def test_clean(self):
         self.assertEqual(self.widget.clean("13.08.2012"), self.date)
 
+    def test_clean_typed(self):
+        self.assertEqual(self.widget.clean(self.date), self.date)
+        self.assertEqual(self.widget.clean(datetime(2012, 8, 13, 18, 0)),
+                         self.date)
+        self.assertEqual(self.widget.render_typed(self.date), self.date)
+
     @override_settings(USE_TZ=True)
     def test_use_tz(self):
         self.assertEqual(self.widget.render(self.date), "13.08.2012")
         self.assertEqual(self.widget.clean("13.08.2012"), self.date)
 
+    def test_many(self):
+        widget = widgets.DateWidget()
+        widget.formats = ('%Y-%m-%d', '%d.%m.%Y')
+        values = ["13.08.2012", "13.08.2012", "2012-08-13", "", self.date]
+        self.assertEqual(widget.clean_many(values), [self.date] * 3 +
+                         [None, self.date])
+        self.assertEqual(widget.formats, ('%Y-%m-%d', '%d.%m.%Y'))
+        self.assertRaises(ValueError, widget.clean_many, ["13/08/2012"])
+        self.assertEqual(self.widget.render_many([self.date, None]),
+                         ["13.08.2012", ""])
+
 
 class DateTimeWidgetTest(TestCase):
 
@@ -68,6 +91,11 @@ class DateTimeWidgetTest(TestCase):
         self.assertEqual(self.widget.clean("13.08.2012 18:00:00"),
                          self.datetime)
 
+    def test_clean_typed(self):
+        self.assertEqual(self.widget.clean(self.datetime), self.datetime)
+        self.assertEqual(self.widget.render_typed(self.datetime),
+                         self.datetime)
+
     @override_settings(USE_TZ=True)
     def test_use_tz(self):
         self.assertEqual(self.widget.render(self.datetime),
@@ -76,6 +104,15 @@ class DateTimeWidgetTest(TestCase):
                                        timezone.get_default_timezone())
         self.assertEqual(self.widget.clean("13.08.2012 18:00:00"),
                          aware_dt)
+        self.assertEqual(self.widget.clean_many(["13.08.2012 18:00:00",
+                                                 self.datetime]),
+                         [aware_dt, aware_dt])
+
+    def test_many(self):
+        self.assertEqual(self.widget.clean_many(["13.08.2012 18:00:00", ""]),
+                         [self.datetime, None])
+        self.assertEqual(self.widget.render_many([self.datetime]),
+                         ["13.08.2012 18:00:00"])
 
 
 class DateWidgetBefore1900Test(TestCase):
@@ -107,6 +144,11 @@ class DecimalWidgetTest(TestCase):
         self.assertEqual(self.widget.clean("0"), Decimal("0"))
         self.assertEqual(self.widget.clean("0.0"), Decimal("0"))
 
+    def test_many(self):
+        self.assertEqual(self.widget.clean_many(["11.111", "", None, "0"]),
+                         [self.value, None, None, Decimal("0")])
+        self.assertEqual(self.widget.render_many([self.value]), [self.value])
+
 
 class IntegerWidgetTest(TestCase):
 
@@ -121,6 +163,27 @@ class IntegerWidgetTest(TestCase):
         self.assertEqual(self.widget.clean("0"), self.value)
         self.assertEqual(self.widget.clean("0.0"), self.value)
 
+    def test_many(self):
+        self.assertEqual(self.widget.clean_many(["0", 1, "2.0", ""]),
+                         [0, 1, 2, None])
+        self.assertRaises(ValueError, self.widget.clean_many, ["x"])
+
+    def test_many_overridden_is_empty(self):
+        class DashIntegerWidget(widgets.IntegerWidget):
+            def is_empty(self, value):
+                return value in (None, "", "-")
+
+        self.assertEqual(DashIntegerWidget().clean_many(["1", "-"]),
+                         [1, None])
+
+
+class CharWidgetTest(TestCase):
+
+    def test_many(self):
+        widget = widgets.CharWidget()
+        self.assertEqual(widget.render_many(["a", 1]), ["a", "1"])
+        self.assertEqual(widget.clean_many(["a", ""]), ["a", ""])
+
 
 class ForeignKeyWidgetTest(TestCase):
 